@@ -0,0 +1,13 @@
+"""
+Shared FastAPI dependencies
+"""
+
+from functools import lru_cache
+
+from app.services.annotation_service import AnnotationService
+
+
+@lru_cache(maxsize=1)
+def get_annotation_service() -> AnnotationService:
+    """Return the process-wide annotation service, created on first use"""
+    return AnnotationService()
@@ -2,24 +2,55 @@
 Annotation endpoints for cognitive trace generation
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body
+from fastapi import (
+    APIRouter, UploadFile, File, HTTPException, Depends, Request, Response,
+    WebSocket, WebSocketDisconnect, status as http_status
+)
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from contextlib import aclosing
 from typing import List, Dict, Any, Optional
+import orjson
 from app.schemas.annotation import (
     AnnotationRequest, 
     AnnotationResponse, 
     BatchAnnotationRequest,
-    LLMConfigSchema
+    LLMConfigSchema,
+    ANNOTATION_REQUEST_ADAPTER
 )
 from app.services.annotation_service import AnnotationService
-from datetime import datetime
-from pydantic import BaseModel
+from app.services.llm_agents import LABEL_SCHEMA
+from app.api.deps import get_annotation_service
+from app.core.errors import NotFoundError
+from app.api.routing import ORJSONRoute
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+# Job and batch bodies can carry hundreds of events; decode them with orjson
+router = APIRouter(route_class=ORJSONRoute)
+
+# Request bodies are read once and never mutated; unknown fields are dropped
+_REQUEST_MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True)
 
-router = APIRouter()
-annotation_service = AnnotationService()
+
+def _check_etag(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """
+    Return a 304 response if the client already has this ETag, otherwise
+    attach the ETag to the outgoing response and return None.
+    """
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 
 @router.post("/annotate", response_model=AnnotationResponse)
-async def annotate_session(request: AnnotationRequest):
+async def annotate_session(
+    request: AnnotationRequest,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Annotate a single user session with cognitive traces using the multi-agent framework.
     
@@ -28,68 +59,149 @@ async def annotate_session(request: AnnotationRequest):
     - Critic (GPT-4o): Challenge and review the analyst's conclusions
     - Judge (GPT-4o): Final decision and justification
     """
+    # response_model documents the shape; the service's dicts skip model validation
+    return ORJSONResponse(await annotation_service.annotate_session(request))
+
+
+@router.post(
+    "/annotate-fast",
+    response_model=AnnotationResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/AnnotationRequest"}}},
+    }},
+)
+async def annotate_session_fast(
+    request: Request,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
+    """
+    Same as /annotate, for large sessions. The body is validated straight from
+    the JSON bytes instead of being decoded to Python objects first.
+    """
     try:
-        result = await annotation_service.annotate_session(request)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        payload = ANNOTATION_REQUEST_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+        )
+    return ORJSONResponse(await annotation_service.annotate_session(payload))
 
 
 @router.post("/batch-annotate")
-async def batch_annotate(request: BatchAnnotationRequest):
+async def batch_annotate(
+    request: BatchAnnotationRequest,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Submit a batch of sessions for annotation. This is processed asynchronously.
     Returns a job_id to track progress.
     """
-    try:
-        job_id = await annotation_service.batch_annotate(request)
-        return {"job_id": job_id, "status": "processing"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job_id = await annotation_service.batch_annotate(request)
+    return {"job_id": job_id, "status": "processing"}
 
 
 @router.post("/upload")
 async def upload_dataset(
     file: UploadFile = File(...),
-    dataset_type: str = "aol"
+    dataset_type: str = "aol",
+    annotation_service: AnnotationService = Depends(get_annotation_service)
 ):
     """
-    Upload a dataset file (CSV or JSON) for annotation.
+    Upload a dataset file (CSV, JSON or JSON Lines) for annotation.
     Supported dataset types: aol, stackoverflow, movielens, custom
     """
-    try:
-        result = await annotation_service.upload_dataset(file, dataset_type)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await annotation_service.upload_dataset(file, dataset_type)
+    return ORJSONResponse(result)
 
 
 @router.get("/dataset/{dataset_id}")
-async def get_dataset_info(dataset_id: str, page: int = 1, limit: int = 10):
+async def get_dataset_info(
+    dataset_id: str,
+    page: int = 1,
+    limit: int = 10,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Get dataset information with paginated session preview.
     """
-    try:
-        info = await annotation_service.get_dataset_info(dataset_id, page, limit)
-        return info
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Dataset {dataset_id} not found")
+    info = await annotation_service.get_dataset_info(dataset_id, page, limit)
+    return ORJSONResponse(info)
 
 
 @router.get("/job/{job_id}")
-async def get_job_status(job_id: str):
+async def get_job_status(
+    job_id: str,
+    request: Request,
+    response: Response,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Get the status of a batch annotation job.
+    Supports If-None-Match so unchanged polls are answered with 304.
+    """
+    etag = annotation_service.get_job_status_etag(job_id)
+    not_modified = _check_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    status = await annotation_service.get_job_status(job_id, etag)
+    # A returned Response does not pick up `response`'s headers by itself
+    return ORJSONResponse(status, headers=response.headers)
+
+
+@router.websocket("/job/{job_id}/ws")
+async def watch_job_status(
+    websocket: WebSocket,
+    job_id: str,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
+    Push job status to the client whenever progress changes, instead of
+    having it poll GET /job/{job_id}. Each message is the same JSON document
+    that endpoint returns. The socket is closed once the job finishes or stops.
+    """
+    await websocket.accept()
     try:
-        status = await annotation_service.get_job_status(job_id)
-        return status
-    except Exception as e:
+        async with aclosing(annotation_service.watch_job_status(job_id)) as updates:
+            async for job_status in updates:
+                await websocket.send_text(orjson.dumps(job_status).decode())
+    except WebSocketDisconnect:
+        return
+    except NotFoundError as e:
+        await websocket.close(code=http_status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+    await websocket.close()
+
+
+@router.get("/job/{job_id}/events")
+async def stream_job_status(
+    job_id: str,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
+    """
+    Server-Sent Events variant of the WebSocket above, for clients that only
+    speak HTTP. Each `progress` event carries the GET /job/{job_id} document;
+    the stream ends once the job finishes or stops.
+    """
+    if annotation_service.get_job_status_etag(job_id) is None:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    async def events():
+        async with aclosing(annotation_service.watch_job_status(job_id)) as updates:
+            async for job_status in updates:
+                yield b"event: progress\ndata: " + orjson.dumps(job_status) + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxies such as nginx would otherwise buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 class StartJobRequest(BaseModel):
     """Request to start an annotation job"""
+    model_config = _REQUEST_MODEL_CONFIG
     dataset_id: str
     llm_config: LLMConfigSchema
     dataset_name: str = "dataset"
@@ -97,7 +209,10 @@ class StartJobRequest(BaseModel):
 
 
 @router.post("/start-job")
-async def start_annotation_job(request: StartJobRequest):
+async def start_annotation_job(
+    request: StartJobRequest,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Start annotation job for an uploaded dataset.
     
@@ -107,53 +222,64 @@ async def start_annotation_job(request: StartJobRequest):
     - dataset_name: Name for output files (optional)
     - resume_job_id: Job ID to resume from checkpoint (optional)
     """
-    try:
-        result = await annotation_service.start_annotation_job(
-            request.dataset_id, 
-            request.llm_config.model_dump(), 
-            request.dataset_name, 
-            request.resume_job_id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await annotation_service.start_annotation_job(
+        request.dataset_id, 
+        request.llm_config.model_dump(), 
+        request.dataset_name, 
+        request.resume_job_id
+    )
+    return ORJSONResponse(result)
 
 
 @router.get("/job/{job_id}/session/{session_id}/log")
-async def get_session_log(job_id: str, session_id: str):
+async def get_session_log(
+    job_id: str,
+    session_id: str,
+    request: Request,
+    response: Response,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Get detailed agent interaction log for a specific session.
+    Supports If-None-Match so unchanged polls are answered with 304.
     """
-    try:
-        log = await annotation_service.get_session_log(job_id, session_id)
-        if log is None:
-            raise HTTPException(status_code=404, detail=f"Log not found for session {session_id}")
-        return log
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    not_modified = _check_etag(
+        request, response, annotation_service.get_session_log_etag(job_id, session_id)
+    )
+    if not_modified is not None:
+        return not_modified
+    log = await annotation_service.get_session_log(job_id, session_id)
+    if log is None:
+        raise HTTPException(status_code=404, detail=f"Log not found for session {session_id}")
+    return ORJSONResponse(log, headers=response.headers)
 
 
 @router.post("/job/{job_id}/stop")
-async def stop_job(job_id: str):
+async def stop_job(
+    job_id: str,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Request a job to stop gracefully. The job will complete the current session
     and then stop. Progress is saved via checkpoint system for later resumption.
     """
-    try:
-        result = await annotation_service.stop_job(job_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    result = await annotation_service.stop_job(job_id)
+    return result
 
 
 class ResumeJobRequest(BaseModel):
     """Request to resume an annotation job"""
+    model_config = _REQUEST_MODEL_CONFIG
     dataset_id: Optional[str] = None
     llm_config: Optional[LLMConfigSchema] = None
 
 
 @router.post("/job/{job_id}/resume")
-async def resume_job(job_id: str, request: Optional[ResumeJobRequest] = None):
+async def resume_job(
+    job_id: str,
+    request: Optional[ResumeJobRequest] = None,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Resume a paused or stopped annotation job from its checkpoint.
     
@@ -163,60 +289,42 @@ async def resume_job(job_id: str, request: Optional[ResumeJobRequest] = None):
     
     The job will continue processing remaining sessions from where it left off.
     """
-    try:
-        dataset_id = request.dataset_id if request else None
-        llm_config = request.llm_config.model_dump() if request and request.llm_config else None
-        result = await annotation_service.resume_job(job_id, dataset_id, llm_config)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=str(e))
-
-
-@router.get("/config/default")
-async def get_default_config():
-    """
-    Get default LLM configuration with all available options and their descriptions.
-    Use this as a starting point for customization.
-    """
-    default_config = LLMConfigSchema()
-    return {
-        "config": default_config.model_dump(),
-        "schema": LLMConfigSchema.model_json_schema(),
-        "strategies": {
-            "truncate": {
-                "name": "Truncate Content",
-                "description": "Processes all events but truncates content length based on session size",
-                "best_for": "Most sessions, balances accuracy and cost",
-                "pros": ["Sees entire session context", "Good for understanding full journey"],
-                "cons": ["May lose detail in long content"]
-            },
-            "sliding_window": {
-                "name": "Sliding Window",
-                "description": "Only processes the last N events (configurable window_size)",
-                "best_for": "Very long sessions (>100 events)",
-                "pros": ["Consistent processing time", "Full detail for recent events"],
-                "cons": ["Loses early session context", "May miss important patterns"]
-            },
-            "full": {
-                "name": "Full Processing",
-                "description": "Processes all events with full content (may hit token limits)",
-                "best_for": "Short sessions with critical detail",
-                "pros": ["Maximum detail preserved", "Best accuracy for short sessions"],
-                "cons": ["Expensive", "May fail on very long sessions"]
-            }
+    dataset_id = request.dataset_id if request else None
+    llm_config = request.llm_config.model_dump() if request and request.llm_config else None
+    result = await annotation_service.resume_job(job_id, dataset_id, llm_config)
+    return ORJSONResponse(result)
+
+
+# Default configuration and prompt payloads are static, so build them once at import
+_DEFAULT_CONFIG_PAYLOAD = {
+    "config": LLMConfigSchema().model_dump(),
+    "schema": LLMConfigSchema.model_json_schema(),
+    "strategies": {
+        "truncate": {
+            "name": "Truncate Content",
+            "description": "Processes all events but truncates content length based on session size",
+            "best_for": "Most sessions, balances accuracy and cost",
+            "pros": ["Sees entire session context", "Good for understanding full journey"],
+            "cons": ["May lose detail in long content"]
+        },
+        "sliding_window": {
+            "name": "Sliding Window",
+            "description": "Only processes the last N events (configurable window_size)",
+            "best_for": "Very long sessions (>100 events)",
+            "pros": ["Consistent processing time", "Full detail for recent events"],
+            "cons": ["Loses early session context", "May miss important patterns"]
+        },
+        "full": {
+            "name": "Full Processing",
+            "description": "Processes all events with full content (may hit token limits)",
+            "best_for": "Short sessions with critical detail",
+            "pros": ["Maximum detail preserved", "Best accuracy for short sessions"],
+            "cons": ["Expensive", "May fail on very long sessions"]
         }
     }
+}
 
-
-@router.get("/config/prompts")
-async def get_default_prompts():
-    """
-    Get default prompts for each agent (Analyst, Critic, Judge).
-    Copy and modify these for custom prompt overrides.
-    """
-    from app.services.llm_agents import LABEL_SCHEMA
-    
-    analyst_prompt = """You are an expert behavioral analyst specializing in Information Foraging Theory. Your task is to analyze user behavior and assign cognitive labels to each event in the session.
+_ANALYST_PROMPT = """You are an expert behavioral analyst specializing in Information Foraging Theory. Your task is to analyze user behavior and assign cognitive labels to each event in the session.
 
 {LABEL_SCHEMA}
 
@@ -243,8 +351,8 @@ Return a JSON array with one object per event:
 ```
 
 Provide ONLY the JSON array, no additional text."""
-    
-    critic_prompt = """You are a critical reviewer specializing in Information Foraging Theory. Your role is to challenge and review the Analyst's cognitive label assignments.
+
+_CRITIC_PROMPT = """You are a critical reviewer specializing in Information Foraging Theory. Your role is to challenge and review the Analyst's cognitive label assignments.
 
 {LABEL_SCHEMA}
 
@@ -272,8 +380,8 @@ Be thorough and question assumptions. Look for alternative explanations.
 ```
 
 Provide ONLY the JSON array, no additional text."""
-    
-    judge_prompt = """You are the final arbiter in a multi-agent cognitive labeling system. Your role is to synthesize the Analyst's and Critic's perspectives and make the final decision.
+
+_JUDGE_PROMPT = """You are the final arbiter in a multi-agent cognitive labeling system. Your role is to synthesize the Analyst's and Critic's perspectives and make the final decision.
 
 {LABEL_SCHEMA}
 
@@ -302,179 +410,111 @@ For EACH event, provide:
 ```
 
 Provide ONLY the JSON array, no additional text."""
-    
-    return {
-        "analyst_prompt": analyst_prompt,
-        "critic_prompt": critic_prompt,
-        "judge_prompt": judge_prompt,
-        "label_schema": LABEL_SCHEMA,
-        "notes": {
-            "placeholders": {
-                "{LABEL_SCHEMA}": "Automatically replaced with cognitive label definitions",
-                "{events_str}": "Automatically replaced with formatted session events (Analyst)",
-                "{analysis_str}": "Automatically replaced with analyst decisions (Critic)",
-                "{deliberation_str}": "Automatically replaced with all agent decisions (Judge)"
-            },
-            "customization_tips": [
-                "Keep the JSON output format exactly as shown",
-                "You can adjust the tone, level of detail, or add domain-specific guidance",
-                "Placeholders are automatically filled - don't remove them",
-                "Test with a few sessions before running on full dataset"
-            ]
-        }
+
+_DEFAULT_PROMPTS_PAYLOAD = {
+    "analyst_prompt": _ANALYST_PROMPT,
+    "critic_prompt": _CRITIC_PROMPT,
+    "judge_prompt": _JUDGE_PROMPT,
+    "label_schema": LABEL_SCHEMA,
+    "notes": {
+        "placeholders": {
+            "{LABEL_SCHEMA}": "Automatically replaced with cognitive label definitions",
+            "{events_str}": "Automatically replaced with formatted session events (Analyst)",
+            "{analysis_str}": "Automatically replaced with analyst decisions (Critic)",
+            "{deliberation_str}": "Automatically replaced with all agent decisions (Judge)"
+        },
+        "customization_tips": [
+            "Keep the JSON output format exactly as shown",
+            "You can adjust the tone, level of detail, or add domain-specific guidance",
+            "Placeholders are automatically filled - don't remove them",
+            "Test with a few sessions before running on full dataset"
+        ]
     }
+}
+
+
+@router.get("/config/default")
+async def get_default_config():
+    """
+    Get default LLM configuration with all available options and their descriptions.
+    Use this as a starting point for customization.
+    """
+    return _DEFAULT_CONFIG_PAYLOAD
+
+
+@router.get("/config/prompts")
+async def get_default_prompts():
+    """
+    Get default prompts for each agent (Analyst, Critic, Judge).
+    Copy and modify these for custom prompt overrides.
+    """
+    return _DEFAULT_PROMPTS_PAYLOAD
 
 
 @router.post("/job/{job_id}/session/{session_id}/resolve")
-async def resolve_session_annotation(job_id: str, session_id: str, payload: Dict[str, Any]):
+async def resolve_session_annotation(
+    job_id: str,
+    session_id: str,
+    payload: Dict[str, Any],
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
     """
     Resolve flagged annotations for a session by applying a user-selected label.
     Overwrites cognitive labels for flagged events and updates output/logs.
     Works with both active and completed jobs.
     """
-    try:
-        from pathlib import Path
-        import json
-        from datetime import datetime
-        
-        label = payload.get('label')
-        note = payload.get('note', '')
-        dataset_name = payload.get('dataset_name', 'dataset')
-        
-        if not label:
-            raise HTTPException(status_code=400, detail="label is required")
-
-        # Try to get log from active job first
-        log = None
-        if job_id in annotation_service.active_jobs:
-            orchestrator = annotation_service.active_jobs[job_id]
-            log = orchestrator.get_session_log(session_id, job_id)
-        
-        # If not in active jobs, load from saved log file
-        if not log:
-            log_file = annotation_service.output_dir / job_id / "logs" / f"{session_id}_log.json"
-            if not log_file.exists():
-                raise HTTPException(status_code=404, detail=f"Log not found for session {session_id} in job {job_id}")
-            
-            with open(log_file, 'r') as f:
-                log = json.load(f)
-
-        # Overwrite flagged events' cognitive_label with user label and add metadata
-        updated_count = 0
-        flagged_event_ids = []
-        for ev in log.get('events', []):
-            if ev.get('flagged_for_review', False):
-                ev['cognitive_label'] = label
-                ev['user_override'] = True
-                ev['user_note'] = note
-                # Increment version (default from 1)
-                try:
-                    ev['override_version'] = int(ev.get('override_version', 1)) + 1
-                except Exception:
-                    ev['override_version'] = 2
-                ev['override_timestamp'] = datetime.now().isoformat()
-                flagged_event_ids.append(ev.get('event_id'))
-                updated_count += 1
-        
-        print(f"RESOLVE: Session {session_id} - Updated {updated_count} events in log. Flagged IDs: {flagged_event_ids}")
-
-        # Persist back to log file
-        log_file = annotation_service.output_dir / job_id / "logs" / f"{session_id}_log.json"
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(log_file, 'w') as f:
-            json.dump(log, f, indent=2)
-
-        # Update session log in active orchestrator if available
-        if job_id in annotation_service.active_jobs:
-            annotation_service.active_jobs[job_id].session_logs[session_id] = log
-
-        # Update CSV file
-        output_file = annotation_service.output_dir / job_id / f"{dataset_name}_cognitive_traces.csv"
-        if output_file.exists():
-            # Read existing CSV, find and update the session rows, then rewrite
-            import csv
-            rows = []
-            fieldnames = None
-            updated_csv_count = 0
-            session_event_ids_in_csv = set()
-            
-            with open(output_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
-                    if row.get('session_id') == session_id:
-                        session_event_ids_in_csv.add(row.get('event_id'))
-                        # Find corresponding event in the updated log
-                        event_id = row.get('event_id')
-                        for ev in log.get('events', []):
-                            if str(ev.get('event_id')) == str(event_id):
-                                # Check if this event was flagged and now has user_override
-                                if ev.get('user_override', False):
-                                    print(f"CSV UPDATE: Updating event {event_id} with label {label}")
-                                    row['cognitive_label'] = label
-                                    row['user_override'] = 'True'
-                                    # Update override_version and timestamp
-                                    row['override_version'] = str(ev.get('override_version', 2))
-                                    row['override_timestamp'] = ev.get('override_timestamp', datetime.now().isoformat())
-                                    updated_csv_count += 1
-                                break
-                    rows.append(row)
-            
-            # Check if there are events in the log that are missing from CSV
-            log_event_ids = {str(ev['event_id']) for ev in log.get('events', [])}
-            missing_event_ids = log_event_ids - session_event_ids_in_csv
-            
-            if missing_event_ids:
-                print(f"CSV UPDATE: WARNING - {len(missing_event_ids)} events in log but not in CSV: {missing_event_ids}")
-                # Add missing events from log to CSV
-                for ev in log.get('events', []):
-                    if str(ev['event_id']) in missing_event_ids:
-                        new_row = {
-                            'session_id': session_id,
-                            'event_id': ev.get('event_id', ''),
-                            'event_timestamp': ev.get('timestamp', ''),
-                            'action_type': ev.get('action_type', ''),
-                            'content': ev.get('content', ''),
-                            'cognitive_label': ev.get('cognitive_label', ''),
-                            'analyst_label': ev.get('analyst_label', ''),
-                            'analyst_justification': ev.get('analyst_justification', ''),
-                            'critic_label': ev.get('critic_label', ''),
-                            'critic_agreement': ev.get('critic_agreement', ''),
-                            'critic_justification': ev.get('critic_justification', ''),
-                            'judge_justification': ev.get('judge_justification', ''),
-                            'confidence_score': ev.get('confidence_score', 0),
-                            'disagreement_score': ev.get('disagreement_score', 0),
-                            'flagged_for_review': str(ev.get('flagged_for_review', False)),
-                            'user_override': 'True' if ev.get('user_override', False) else 'False',
-                            'override_version': ev.get('override_version', 1),
-                            'override_timestamp': ev.get('override_timestamp', '')
-                        }
-                        rows.append(new_row)
-                        if ev.get('user_override', False):
-                            updated_csv_count += 1
-                            print(f"CSV UPDATE: Added missing event {ev['event_id']} with user override")
-            
-            # Rewrite CSV with updated data
-            if rows and fieldnames:
-                with open(output_file, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(rows)
-                
-                print(f"CSV UPDATE: Updated {updated_csv_count} events for session {session_id} in {output_file}")
-            else:
-                print(f"CSV UPDATE: WARNING - No rows or fieldnames found for {output_file}")
-
-        return {
-            "status": "ok",
-            "session_id": session_id,
-            "label": label,
-            "updated_events": updated_count
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    label = payload.get('label')
+    if not label:
+        raise HTTPException(status_code=400, detail="label is required")
+    
+    result = await annotation_service.resolve_session(
+        job_id,
+        session_id,
+        label,
+        note=payload.get('note', ''),
+        dataset_name=payload.get('dataset_name', 'dataset')
+    )
+    return ORJSONResponse(result)
+
+
+class SessionResolution(BaseModel):
+    """A user-selected label for one session of a job"""
+    model_config = _REQUEST_MODEL_CONFIG
+    session_id: str
+    label: str
+    note: str = ""
+    event_ids: Optional[List[str]] = None
+
+
+class BatchResolveRequest(BaseModel):
+    """Request to resolve several sessions of a job in one call"""
+    model_config = _REQUEST_MODEL_CONFIG
+    resolutions: List[SessionResolution]
+    dataset_name: str = "dataset"
+
 
+@router.post("/job/{job_id}/resolve-batch")
+async def resolve_session_annotations(
+    job_id: str,
+    request: BatchResolveRequest,
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
+    """
+    Resolve flagged annotations for several sessions at once.
+    
+    Each resolution applies its label to the listed event_ids, or to the
+    session's flagged events when event_ids is omitted. The output CSV is
+    rewritten a single time for the whole batch.
+    """
+    if not request.resolutions:
+        raise HTTPException(status_code=400, detail="resolutions must not be empty")
+    session_ids = [r.session_id for r in request.resolutions]
+    if len(set(session_ids)) != len(session_ids):
+        raise HTTPException(status_code=400, detail="each session may only be resolved once per batch")
+    
+    result = await annotation_service.resolve_sessions(
+        job_id,
+        [r.model_dump() for r in request.resolutions],
+        request.dataset_name
+    )
+    return ORJSONResponse(result)
@@ -3,15 +3,427 @@ Export endpoints for annotated data
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse, Response
-from typing import Optional
+from fastapi.responses import StreamingResponse, Response, FileResponse
+from typing import Optional, Iterator, List, Tuple
+from collections import OrderedDict
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-import json
 import csv
+import hashlib
 import io
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import numpy as np
+import orjson
+import pandas as pd
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+# Project root (two levels above backend/app/api/endpoints/), resolved once at import
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Rows are buffered and flushed to the client in batches of this size
+EXPORT_BATCH_ROWS = 1000
+# Dataset-specific lookups remembered by _find_job_file
+JOB_FILE_CACHE_SIZE = 64
+# Traces CSVs whose session offsets are kept in memory
+SESSION_INDEX_CACHE_SIZE = 8
+
+# Columns of the traces JSON export, in output order
+TRACE_COLUMNS = (
+    'session_id', 'event_id', 'event_timestamp', 'action_type', 'content',
+    'cognitive_label', 'analyst_label', 'analyst_justification',
+    'critic_label', 'critic_agreement', 'critic_justification',
+    'judge_justification', 'confidence_score', 'disagreement_score',
+    'flagged_for_review', 'user_override', 'override_version', 'override_timestamp',
+)
+TRACE_FLOAT_COLUMNS = ('confidence_score', 'disagreement_score')
+TRACE_BOOL_COLUMNS = ('flagged_for_review', 'user_override')
+# Spellings of a true flag; a hash lookup avoids lowercasing every cell
+_BOOL_TRUE = frozenset({'true', 'True', 'TRUE', '1', 'yes'})
+
+# Layout of the `*.offsets.npy` sidecar written next to a traces CSV. Row 0
+# records the CSV version it describes as (mtime_ns, size, header_end); the
+# other rows are (session hash, start, end) runs sorted by hash.
+SESSION_OFFSETS_DTYPE = np.dtype([('sid_hash', '<u8'), ('start', '<u8'), ('end', '<u8')])
+
+# (suffix, dataset, data dir mtime_ns) -> path. Adding or removing a job
+# directory changes the data dir mtime, so stale keys simply stop matching.
+_job_file_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+# (path, mtime_ns, size) -> session offsets of that CSV version. Appends and
+# resolve rewrites change the key. Filtered exports run in the threadpool,
+# hence the lock.
+_session_index_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_session_index_lock = threading.Lock()
+
+
+def _iter_job_dirs(data_dir: Path) -> Iterator[str]:
+    """Yield the paths of the non-hidden job directories under data_dir."""
+    # DirEntry caches the file type from the directory read, so no extra stat()
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and not entry.name.startswith('.'):
+                yield entry.path
+
+
+def _find_job_file(suffix: str, dataset: Optional[str]) -> Optional[Path]:
+    """
+    Find `{dataset}{suffix}` in any job directory, falling back to the first
+    file ending in suffix when there is no dataset-specific match.
+    """
+    try:
+        data_dir_mtime = DATA_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Data directory not found")
+    
+    target = f"{dataset}{suffix}" if dataset else None
+    if target:
+        # Repeat downloads resolve with one stat() instead of a directory walk.
+        # Only exact matches are cached; the fallback may change as jobs write
+        # their files.
+        cache_key = (suffix, dataset, data_dir_mtime)
+        cached = _job_file_cache.get(cache_key)
+        if cached is not None and os.path.isfile(cached):
+            _job_file_cache.move_to_end(cache_key)
+            return Path(cached)
+    
+    # Single pass over the job directories: stop at the dataset-specific file,
+    # remembering the first generic match in case there is none
+    fallback = None
+    for job_path in _iter_job_dirs(DATA_DIR):
+        with os.scandir(job_path) as children:
+            for child in children:
+                if not child.name.endswith(suffix) or not child.is_file():
+                    continue
+                if child.name == target:
+                    _job_file_cache[cache_key] = child.path
+                    if len(_job_file_cache) > JOB_FILE_CACHE_SIZE:
+                        _job_file_cache.popitem(last=False)
+                    return Path(child.path)
+                if fallback is None:
+                    fallback = child.path
+                    if target is None:
+                        return Path(fallback)
+    
+    return Path(fallback) if fallback else None
+
+
+def _find_traces_csv(dataset: Optional[str]) -> Optional[Path]:
+    """Find the most recent cognitive traces CSV file for the dataset."""
+    return _find_job_file("_cognitive_traces.csv", dataset)
+
+
+def _parse_session_ids(session_ids: Optional[str]) -> Optional[frozenset]:
+    """
+    Parse the comma-separated session_ids query parameter into a set, so
+    filters do one hash lookup per row instead of scanning every ID.
+    """
+    if session_ids is None:
+        return None
+    return frozenset(sid.strip() for sid in session_ids.split(',') if sid.strip())
+
+
+def _iter_record_spans(mm: mmap.mmap) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the (start, end) byte span of every CSV record, newline included.
+    
+    Newlines are located with mmap.find, which is a memchr scan. Content fields
+    may contain quoted newlines, so a newline only ends a record once the
+    quotes seen since the record started are balanced.
+    """
+    size = len(mm)
+    start = pos = 0
+    quotes = 0
+    while pos < size:
+        newline = mm.find(b'\n', pos)
+        end = size if newline == -1 else newline + 1
+        quotes += mm[pos:end].count(b'"')
+        pos = end
+        if not quotes & 1:
+            yield start, end
+            start = pos
+            quotes = 0
+    if start < size:
+        yield start, size
+
+
+def _record_session_id(mm: mmap.mmap, start: int, end: int, session_idx: int) -> bytes:
+    """Return the raw session_id field of the record at mm[start:end]."""
+    if session_idx == 0:
+        # Leading column: slice it out without parsing the rest of the row
+        if mm[start] == 0x22:
+            close = mm.find(b'"', start + 1, end)
+            if close != -1 and mm[close + 1:close + 2] != b'"':
+                return mm[start + 1:close]
+        else:
+            comma = mm.find(b',', start, end)
+            return mm[start:end if comma == -1 else comma].rstrip(b'\r\n')
+    # Escaped quotes or another column position: parse the record properly
+    row = next(csv.reader(io.StringIO(mm[start:end].decode('utf-8'), newline='')), [])
+    return row[session_idx].encode('utf-8') if session_idx < len(row) else b''
+
+
+def _session_hash(session_id: bytes) -> int:
+    """64-bit hash of a raw session_id, the sort key of the offsets index."""
+    return int.from_bytes(hashlib.blake2b(session_id, digest_size=8).digest(), 'little')
+
+
+def _session_offsets_path(csv_path: Path) -> Path:
+    """Path of the offsets sidecar of a traces CSV."""
+    return csv_path.with_name(f"{csv_path.stem}.offsets.npy")
+
+
+def _build_session_offsets(mm: mmap.mmap, stat: os.stat_result) -> np.ndarray:
+    """
+    Index the traces CSV by session in one scan.
+    
+    Each run is the byte range of consecutive rows of one session. The
+    orchestrator writes a session's rows together, so there is usually one
+    run per session; rows a resolve appended at the end form a second run.
+    """
+    spans = _iter_record_spans(mm)
+    header_start, header_end = next(spans)
+    header = next(csv.reader([mm[header_start:header_end].decode('utf-8')]), [])
+    session_idx = header.index('session_id') if 'session_id' in header else 0
+    
+    runs = []
+    run = None
+    for start, end in spans:
+        session_id = _record_session_id(mm, start, end, session_idx)
+        if run is not None and run[0] == session_id:
+            run[2] = end
+        else:
+            run = [session_id, start, end]
+            runs.append(run)
+    
+    offsets = np.empty(len(runs) + 1, dtype=SESSION_OFFSETS_DTYPE)
+    offsets[0] = (stat.st_mtime_ns, stat.st_size, header_end)
+    offsets[1:] = [(_session_hash(session_id), start, end) for session_id, start, end in runs]
+    offsets[1:].sort(order=('sid_hash', 'start'))
+    return offsets
+
+
+def _load_session_offsets(path: Path, stat: os.stat_result) -> Optional[np.ndarray]:
+    """Memory-map the offsets sidecar if it describes this version of the CSV."""
+    try:
+        offsets = np.load(_session_offsets_path(path), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if offsets.dtype != SESSION_OFFSETS_DTYPE or len(offsets) == 0:
+        return None
+    if (int(offsets[0]['sid_hash']), int(offsets[0]['start'])) != (stat.st_mtime_ns, stat.st_size):
+        return None
+    return offsets
+
+
+def _save_session_offsets(path: Path, offsets: np.ndarray):
+    """Write the offsets sidecar atomically; on failure the index stays in memory only."""
+    target = _session_offsets_path(path)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, offsets)
+        os.replace(tmp_path, target)
+        tmp_path = None
+    except OSError as e:
+        logger.warning("Could not write session offsets for %s: %s", path, e)
+    finally:
+        # Whatever failed, a GET must not leave files behind in the job directory
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _get_session_offsets(path: Path, mm: mmap.mmap, stat: os.stat_result) -> np.ndarray:
+    """
+    Return the session offsets for this version of the CSV.
+    
+    Looked up in memory first, then in the sidecar, which survives restarts
+    and is shared by every worker process; built and saved otherwise.
+    """
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _session_index_lock:
+        offsets = _session_index_cache.get(key)
+        if offsets is not None:
+            _session_index_cache.move_to_end(key)
+            return offsets
+    
+    offsets = _load_session_offsets(path, stat)
+    if offsets is None:
+        offsets = _build_session_offsets(mm, stat)
+        _save_session_offsets(path, offsets)
+    
+    with _session_index_lock:
+        _session_index_cache[key] = offsets
+        while len(_session_index_cache) > SESSION_INDEX_CACHE_SIZE:
+            _session_index_cache.popitem(last=False)
+    return offsets
+
+
+def _iter_filtered_csv(path: Path, wanted: frozenset) -> Iterator[bytes]:
+    """
+    Yield the header and the rows belonging to the wanted sessions.
+    
+    The file is memory-mapped and matched as bytes, so rows are passed through
+    unchanged without being decoded, parsed and re-quoted. Matching runs are
+    found with np.searchsorted on the session offsets index, so only their
+    byte ranges are read. This stays a sync generator that Starlette drives
+    off the event loop; batching keeps that to one thread hop per
+    EXPORT_BATCH_ROWS runs.
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            return
+        # Map only the size that was stat'ed, so a concurrent append cannot
+        # make the index and the mapping disagree
+        with mmap.mmap(f.fileno(), stat.st_size, access=mmap.ACCESS_READ) as mm:
+            if not wanted:
+                # Filter parsed to no IDs: header only, without indexing the file
+                header_start, header_end = next(_iter_record_spans(mm))
+                yield mm[header_start:header_end]
+                return
+            
+            offsets = _get_session_offsets(path, mm, stat)
+            header_end = int(offsets[0]['end'])
+            runs = offsets[1:]
+            header = next(csv.reader([mm[:header_end].decode('utf-8')]), [])
+            session_idx = header.index('session_id') if 'session_id' in header else 0
+            
+            wanted_ids = [session_id.encode('utf-8') for session_id in wanted]
+            wanted_hashes = np.array([_session_hash(sid) for sid in wanted_ids], dtype='<u8')
+            lo = np.searchsorted(runs['sid_hash'], wanted_hashes, side='left')
+            hi = np.searchsorted(runs['sid_hash'], wanted_hashes, side='right')
+            
+            matched = []
+            for session_id, i, j in zip(wanted_ids, lo, hi):
+                for start, end in zip(runs['start'][i:j].tolist(), runs['end'][i:j].tolist()):
+                    # 64-bit hashes can collide; confirm against the row itself
+                    if _record_session_id(mm, start, end, session_idx) == session_id:
+                        matched.append((start, end))
+            # Back to file order, as a linear scan would emit them
+            matched.sort()
+            
+            batch = [mm[:header_end]]
+            for start, end in matched:
+                batch.append(mm[start:end])
+                if len(batch) >= EXPORT_BATCH_ROWS:
+                    yield b''.join(batch)
+                    batch = []
+            
+            if batch:
+                yield b''.join(batch)
+
+
+def _typed_traces(frame: pd.DataFrame) -> pd.DataFrame:
+    """Project a chunk of raw CSV strings onto the export columns with JSON types."""
+    frame = frame.reindex(columns=list(TRACE_COLUMNS), fill_value='')
+    for column in TRACE_FLOAT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(0.0)
+    frame['override_version'] = (
+        pd.to_numeric(frame['override_version'], errors='coerce').fillna(1).astype('int64')
+    )
+    for column in TRACE_BOOL_COLUMNS:
+        frame[column] = frame[column].isin(_BOOL_TRUE)
+    return frame
+
+
+def _trace_records(frame: pd.DataFrame) -> List[dict]:
+    """
+    Build one dict per row from the typed frame.
+    
+    Each column is converted with Series.tolist(), which yields native Python
+    values in C, and rows are assembled by zipping the column tuples;
+    DataFrame.to_dict(orient='records') boxes every cell one at a time.
+    """
+    columns = [frame[column].tolist() for column in TRACE_COLUMNS]
+    return [dict(zip(TRACE_COLUMNS, values)) for values in zip(*columns)]
+
+
+def _iter_trace_records(path: Path, wanted: Optional[frozenset]) -> Iterator[List[dict]]:
+    """
+    Yield the typed event records of the traces CSV, one list per chunk.
+    
+    The CSV is parsed by pandas' C reader in chunks of EXPORT_BATCH_ROWS and
+    filtered and typed column-wise, so memory stays bounded by the chunk size.
+    Only the exported columns are materialized, selected by position.
+    """
+    if wanted is not None and not wanted:
+        return
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader(f), [])
+    if 'session_id' not in header:
+        return
+    usecols = [i for i, name in enumerate(header) if name in TRACE_COLUMNS]
+    
+    with pd.read_csv(
+        path, dtype=str, keep_default_na=False, usecols=usecols, chunksize=EXPORT_BATCH_ROWS
+    ) as reader:
+        for frame in reader:
+            if wanted is not None:
+                frame = frame[frame['session_id'].isin(wanted)]
+                if frame.empty:
+                    continue
+            yield _trace_records(_typed_traces(frame))
+
+
+def _iter_traces_ndjson(path: Path, wanted: Optional[frozenset]) -> Iterator[bytes]:
+    """Yield one JSON object per annotated event, newline-delimited."""
+    for records in _iter_trace_records(path, wanted):
+        yield b''.join(
+            orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+            for record in records
+        )
+
+
+def _iter_traces_json(path: Path, wanted: Optional[frozenset], dataset: Optional[str]) -> Iterator[bytes]:
+    """
+    Yield `{"dataset": ..., "sessions": [{"session_id": ..., "events": [...]}]}`
+    incrementally, encoding each session as soon as its rows end.
+    
+    Rows are grouped by consecutive session_id, which is how the orchestrator
+    writes them, so only one session's events are held at a time. Events a
+    resolve appended at the end of the file form a separate trailing entry.
+    """
+    yield b'{"dataset":' + orjson.dumps(dataset) + b',"sessions":['
+    
+    first = True
+    session_id = None
+    events: List[dict] = []
+    for records in _iter_trace_records(path, wanted):
+        parts = []
+        for session_id_of_row, group in groupby(records, key=itemgetter('session_id')):
+            if session_id_of_row != session_id and events:
+                parts.append(orjson.dumps(
+                    {'session_id': session_id, 'events': events},
+                    option=orjson.OPT_SERIALIZE_NUMPY
+                ))
+                events = []
+            session_id = session_id_of_row
+            events.extend(group)
+        if parts:
+            yield (b',' if not first else b'') + b','.join(parts)
+            first = False
+    
+    if events:
+        yield (b',' if not first else b'') + orjson.dumps(
+            {'session_id': session_id, 'events': events},
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    yield b']}'
+
 
 @router.get("/csv")
 async def export_csv(
@@ -20,71 +432,28 @@ async def export_csv(
 ):
     """
     Export annotations as CSV file.
-    Find the most recent cognitive traces CSV file for the dataset.
+    The file is streamed from disk, so memory use does not grow with its size.
     """
-    try:
-        # Get project root (two levels up from app/api/endpoints/)
-        project_root = Path(__file__).resolve().parent.parent.parent.parent.parent
-        data_dir = project_root / "data"
-        
-        if not data_dir.exists():
-            raise HTTPException(status_code=404, detail="Data directory not found")
-        
-        # Find the CSV file
-        csv_file = None
-        if dataset:
-            # Look for the dataset-specific file
-            csv_pattern = f"{dataset}_cognitive_traces.csv"
-            # Search in all job directories
-            for job_dir in data_dir.iterdir():
-                if job_dir.is_dir() and not job_dir.name.startswith('.'):
-                    candidate = job_dir / csv_pattern
-                    if candidate.exists():
-                        csv_file = candidate
-                        break
-        
-        if not csv_file or not csv_file.exists():
-            # Try to find any cognitive traces CSV
-            for job_dir in data_dir.iterdir():
-                if job_dir.is_dir() and not job_dir.name.startswith('.'):
-                    for f in job_dir.glob("*_cognitive_traces.csv"):
-                        csv_file = f
-                        break
-                    if csv_file:
-                        break
-        
-        if not csv_file or not csv_file.exists():
-            raise HTTPException(status_code=404, detail=f"CSV file not found for dataset: {dataset}")
-        
-        # Read and optionally filter by session IDs
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        if session_ids:
-            # Filter by session IDs
-            session_id_list = [sid.strip() for sid in session_ids.split(',')]
-            lines = content.split('\n')
-            header = lines[0] if lines else ''
-            filtered_lines = [header]
-            
-            for line in lines[1:]:
-                if line.strip() and any(line.startswith(f'"{sid}"') or line.startswith(sid) for sid in session_id_list):
-                    filtered_lines.append(line)
-            
-            content = '\n'.join(filtered_lines)
-        
-        # Return as downloadable CSV
-        filename = csv_file.name if not session_ids else f"{dataset}_filtered_cognitive_traces.csv"
-        return Response(
-            content=content,
+    csv_file = _find_traces_csv(dataset)
+    if not csv_file:
+        raise HTTPException(status_code=404, detail=f"CSV file not found for dataset: {dataset}")
+    
+    wanted = _parse_session_ids(session_ids)
+    if wanted is None:
+        # Unfiltered: hand the file to the server as raw bytes, no decode/encode
+        return FileResponse(
+            csv_file,
             media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers={"Content-Disposition": f"attachment; filename={csv_file.name}"}
         )
     
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error exporting CSV: {str(e)}")
+    # Return as downloadable CSV
+    filename = f"{dataset}_filtered_cognitive_traces.csv"
+    return StreamingResponse(
+        _iter_filtered_csv(csv_file, wanted),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @router.get("/json")
@@ -93,67 +462,77 @@ async def export_json(
     session_ids: Optional[str] = Query(None, description="Comma-separated session IDs")
 ):
     """
-    Export summary report as JSON file.
-    Returns the summary.json file with job metadata and statistics.
+    Export annotations as a JSON document with events grouped by session.
+    The document is encoded and streamed as the CSV is read.
     """
-    try:
-        # Get project root
-        project_root = Path(__file__).resolve().parent.parent.parent.parent.parent
-        data_dir = project_root / "data"
-        
-        if not data_dir.exists():
-            raise HTTPException(status_code=404, detail="Data directory not found")
-        
-        # Find the summary JSON file
-        summary_file = None
-        if dataset:
-            summary_pattern = f"{dataset}_summary.json"
-            for job_dir in data_dir.iterdir():
-                if job_dir.is_dir() and not job_dir.name.startswith('.'):
-                    candidate = job_dir / summary_pattern
-                    if candidate.exists():
-                        summary_file = candidate
-                        break
-        
-        if not summary_file or not summary_file.exists():
-            # Try to find any summary JSON
-            for job_dir in data_dir.iterdir():
-                if job_dir.is_dir() and not job_dir.name.startswith('.'):
-                    for f in job_dir.glob("*_summary.json"):
-                        summary_file = f
-                        break
-                    if summary_file:
-                        break
-        
-        if not summary_file or not summary_file.exists():
-            raise HTTPException(status_code=404, detail=f"Summary JSON file not found for dataset: {dataset}")
-        
-        # Read the summary file
-        with open(summary_file, 'r', encoding='utf-8') as f:
-            summary_data = json.load(f)
-        
-        # Optionally filter by session IDs if needed
-        if session_ids:
-            session_id_list = [sid.strip() for sid in session_ids.split(',')]
-            # Filter flagged_sessions if present
-            if 'flagged_sessions' in summary_data:
-                summary_data['flagged_sessions'] = [
-                    sid for sid in summary_data['flagged_sessions'] 
-                    if sid in session_id_list
-                ]
-        
-        # Return as downloadable JSON
-        filename = f"{dataset}_summary.json" if dataset else "summary.json"
-        json_content = json.dumps(summary_data, indent=2)
-        
-        return Response(
-            content=json_content,
-            media_type="application/json",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+    csv_file = _find_traces_csv(dataset)
+    if not csv_file:
+        raise HTTPException(status_code=404, detail=f"CSV file not found for dataset: {dataset}")
+    
+    filename = f"{dataset}_cognitive_traces.json" if dataset else "cognitive_traces.json"
+    return StreamingResponse(
+        _iter_traces_json(csv_file, _parse_session_ids(session_ids), dataset),
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/ndjson")
+async def export_ndjson(
+    dataset: Optional[str] = None,
+    session_ids: Optional[str] = Query(None, description="Comma-separated session IDs")
+):
+    """
+    Export annotations as newline-delimited JSON, one object per event.
+    Records are encoded and streamed as the CSV is read.
+    """
+    csv_file = _find_traces_csv(dataset)
+    if not csv_file:
+        raise HTTPException(status_code=404, detail=f"CSV file not found for dataset: {dataset}")
     
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error exporting JSON: {str(e)}")
+    filename = f"{dataset}_cognitive_traces.ndjson" if dataset else "cognitive_traces.ndjson"
+    return StreamingResponse(
+        _iter_traces_ndjson(csv_file, _parse_session_ids(session_ids)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
+
+@router.get("/summary")
+async def export_summary(
+    dataset: Optional[str] = None,
+    session_ids: Optional[str] = Query(None, description="Comma-separated session IDs"),
+    pretty: bool = Query(False, description="Indent the JSON for readability")
+):
+    """
+    Export summary report as JSON file.
+    Returns the summary.json file with job metadata and statistics,
+    compact unless pretty=true.
+    """
+    # Find the summary JSON file
+    summary_file = _find_job_file("_summary.json", dataset)
+    if not summary_file:
+        raise HTTPException(status_code=404, detail=f"Summary JSON file not found for dataset: {dataset}")
+    
+    # Read the summary file
+    summary_data = orjson.loads(summary_file.read_bytes())
+    
+    # Optionally filter by session IDs if needed
+    if session_ids:
+        wanted = _parse_session_ids(session_ids)
+        # Filter flagged_sessions if present
+        if 'flagged_sessions' in summary_data:
+            summary_data['flagged_sessions'] = [
+                sid for sid in summary_data['flagged_sessions'] 
+                if sid in wanted
+            ]
+    
+    # Return as downloadable JSON
+    filename = f"{dataset}_summary.json" if dataset else "summary.json"
+    json_content = orjson.dumps(summary_data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    
+    return Response(
+        content=json_content,
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -2,11 +2,24 @@
 Model management endpoints
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, Dict, Any
+import httpx
+import orjson
 from app.services.model_provider import ModelProvider
 
-router = APIRouter()
+# Shared client so repeated endpoint probes reuse pooled connections
+_http_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=50),
+)
+
+
+async def _close_http_client():
+    await _http_client.aclose()
+
+
+router = APIRouter(on_shutdown=[_close_http_client])
 
 
 @router.get("/available")
@@ -97,8 +110,6 @@ async def test_custom_endpoint(
     Test custom OpenAI-compatible endpoint and discover available models.
     Acts as a proxy to avoid CORS issues.
     """
-    import httpx
-    
     # Normalize base URL
     base_url = base_url.rstrip('/')
     
@@ -117,32 +128,31 @@ async def test_custom_endpoint(
         if api_key:
             headers['Authorization'] = f'Bearer {api_key}'
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(models_url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            models_list = data.get('data', data.get('models', []))
-            
-            # Convert to our format
-            models = [
-                {
-                    'id': model.get('id', model.get('model', 'unknown')),
-                    'name': model.get('id', model.get('model', 'unknown')),
-                    'provider': 'custom',
-                    'description': model.get('description', 'Custom model'),
-                    'contextWindow': model.get('context_length', 8192)
-                }
-                for model in models_list
-            ]
-            
-            return {
-                'success': True,
-                'models': models,
-                'count': len(models),
-                'base_url': base_url.replace('/v1', '')  # Return without /v1
+        response = await _http_client.get(models_url, headers=headers)
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        models_list = data.get('data', data.get('models', []))
+        
+        # Convert to our format
+        models = [
+            {
+                'id': model.get('id', model.get('model', 'unknown')),
+                'name': model.get('id', model.get('model', 'unknown')),
+                'provider': 'custom',
+                'description': model.get('description', 'Custom model'),
+                'contextWindow': model.get('context_length', 8192)
             }
-            
+            for model in models_list
+        ]
+        
+        return {
+            'success': True,
+            'models': models,
+            'count': len(models),
+            'base_url': base_url.replace('/v1', '')  # Return without /v1
+        }
+        
     except httpx.HTTPStatusError as e:
         raise HTTPException(
             status_code=e.response.status_code,
@@ -2,12 +2,31 @@
 Session management endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import orjson
 from app.schemas.session import SessionResponse, SessionListResponse
+from app.services.annotation_service import AnnotationService
+from app.api.deps import get_annotation_service
 
 router = APIRouter()
 
+# Summaries encoded per chunk of the NDJSON stream
+STREAM_BATCH_SIZE = 500
+
+
+def _iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records as newline-delimited JSON, one chunk per STREAM_BATCH_SIZE records."""
+    batch = []
+    for record in records:
+        batch.append(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield b''.join(batch)
+            batch = []
+    if batch:
+        yield b''.join(batch)
+
 
 @router.get("/", response_model=SessionListResponse)
 async def list_sessions(
@@ -19,7 +38,20 @@ async def list_sessions(
     List all annotated sessions with pagination.
     """
     # TODO: Implement session listing from database
-    return {"sessions": [], "total": 0, "skip": skip, "limit": limit}
+    return SessionListResponse.build(sessions=[], total=0, skip=skip, limit=limit)
+
+
+@router.get("/stream")
+async def stream_sessions(
+    dataset: str = Query(..., description="Uploaded dataset ID"),
+    annotation_service: AnnotationService = Depends(get_annotation_service)
+):
+    """
+    Stream the session summaries of an uploaded dataset as NDJSON, one
+    SessionSummary object per line, instead of one materialized list.
+    """
+    summaries = await annotation_service.iter_session_summaries(dataset)
+    return StreamingResponse(_iter_ndjson(summaries), media_type="application/x-ndjson")
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
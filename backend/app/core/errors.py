@@ -0,0 +1,71 @@
+"""
+Application-wide error handling
+"""
+
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class NotFoundError(LookupError):
+    """An unknown dataset, job, session or log; answered with 404"""
+
+
+class InvalidInputError(ValueError):
+    """Client input the service cannot use, such as an unparseable upload; answered with 400"""
+
+
+class ConflictError(RuntimeError):
+    """The request clashes with the current state, e.g. resuming a running job; answered with 409"""
+
+
+def _status_handler(status_code: int):
+    async def handler(request: Request, exc: Exception) -> ORJSONResponse:
+        return ORJSONResponse(status_code=status_code, content={"detail": str(exc)})
+    return handler
+
+
+class UnhandledErrorMiddleware:
+    """
+    Turn uncaught exceptions into a JSON 500 response.
+
+    Starlette routes an `Exception` handler to the outermost middleware, where
+    the response would miss the CORS headers and the UI could not read the
+    error detail. This plain ASGI middleware is installed inside CORS instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                raise
+            logger.exception("Unhandled error on %s %s", scope.get("method"), scope.get("path"))
+            response = ORJSONResponse(status_code=500, content={"detail": str(exc)})
+            await response(scope, receive, send)
+
+
+def register_exception_handlers(app: FastAPI):
+    """Install the error handlers. Call before adding CORSMiddleware."""
+    app.add_exception_handler(NotFoundError, _status_handler(404))
+    app.add_exception_handler(InvalidInputError, _status_handler(400))
+    app.add_exception_handler(ConflictError, _status_handler(409))
+    app.add_middleware(UnhandledErrorMiddleware)
@@ -3,9 +3,13 @@ Main FastAPI application for Cognitive Traces API
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api import router as api_router
 from app.core.config import settings
+from app.core.errors import register_exception_handlers
+from app.services.prompt_cache import close_prompt_cache
 
 app = FastAPI(
     title="Cognitive Traces API",
@@ -13,31 +17,63 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    # Pydantic validates requests; responses are encoded by orjson
+    default_response_class=ORJSONResponse,
+    on_shutdown=[close_prompt_cache],
 )
 
+# Error handlers sit inside CORS so error responses keep CORS headers
+register_exception_handlers(app)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    # Starlette tests `origin in allow_origins`; a frozenset makes that O(1)
+    allow_origins=settings.CORS_ORIGINS_SET,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the cross-origin UI read ETag and send it back in If-None-Match
+    expose_headers=["ETag"],
 )
 
+# Progress streams must reach the client event by event. GZipMiddleware
+# buffers into its compressor, and Starlette only learned to skip
+# text/event-stream long after the FastAPI release pinned here.
+_UNCOMPRESSED_PATH_SUFFIXES = ("/events", "/sessions/stream")
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes the SSE and NDJSON progress streams through untouched"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith(_UNCOMPRESSED_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# CSV and JSON exports compress several-fold; the middleware adds Vary itself
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1024)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
 
+# Static bodies, encoded once; Starlette does not mutate a Response when sending it
+_ROOT = ORJSONResponse({
+    "message": "Cognitive Traces API",
+    "version": "0.1.0",
+    "docs": "/api/docs"
+})
+_HEALTH = Response(content=b'{"status":"healthy"}', media_type="application/json")
+
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Cognitive Traces API",
-        "version": "0.1.0",
-        "docs": "/api/docs"
-    }
+    return _ROOT
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
-
+    return _HEALTH
@@ -1,27 +1,60 @@
 """
 Pydantic schemas for request/response validation
+
+Names are resolved lazily (PEP 562), so importing one schema module does not
+build the models of the others.
 """
 
-from app.schemas.annotation import (
-    CognitiveLabel,
-    EventData,
-    AnnotationRequest,
-    AnnotationResponse,
-    BatchAnnotationRequest
-)
-from app.schemas.session import SessionResponse, SessionListResponse
-from app.schemas.model import ModelInfo, PredictionRequest, PredictionResponse
-
-__all__ = [
-    'CognitiveLabel',
-    'EventData',
-    'AnnotationRequest',
-    'AnnotationResponse',
-    'BatchAnnotationRequest',
-    'SessionResponse',
-    'SessionListResponse',
-    'ModelInfo',
-    'PredictionRequest',
-    'PredictionResponse',
-]
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.schemas.annotation import (
+        CognitiveLabel,
+        CognitiveLabels,
+        COGNITIVE_LABELS,
+        EventData,
+        AnnotationRequest,
+        AnnotationResponse,
+        BatchAnnotationRequest,
+        EVENTS_ADAPTER,
+        ANNOTATION_REQUEST_ADAPTER,
+        BATCHED_AGENT_RESPONSE_ADAPTER
+    )
+    from app.schemas.session import SessionResponse, SessionListResponse
+    from app.schemas.model import ModelInfo, PredictionRequest, PredictionResponse
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'CognitiveLabel': 'annotation',
+    'CognitiveLabels': 'annotation',
+    'COGNITIVE_LABELS': 'annotation',
+    'EventData': 'annotation',
+    'AnnotationRequest': 'annotation',
+    'AnnotationResponse': 'annotation',
+    'BatchAnnotationRequest': 'annotation',
+    'EVENTS_ADAPTER': 'annotation',
+    'ANNOTATION_REQUEST_ADAPTER': 'annotation',
+    'BATCHED_AGENT_RESPONSE_ADAPTER': 'annotation',
+    'SessionResponse': 'session',
+    'SessionListResponse': 'session',
+    'ModelInfo': 'model',
+    'PredictionRequest': 'model',
+    'PredictionResponse': 'model',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f"app.schemas.{module_name}"), name)
+    globals()[name] = value
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,19 +2,37 @@
 Pydantic schemas for annotation requests and responses
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, FrozenSet, Literal, get_args
+from typing_extensions import Annotated, NotRequired, TypedDict
 from enum import Enum
 
 
-class CognitiveLabel(str, Enum):
-    """Cognitive labels based on Information Foraging Theory"""
-    FOLLOWING_SCENT = "FollowingScent"
-    APPROACHING_SOURCE = "ApproachingSource"
-    DIET_ENRICHMENT = "DietEnrichment"
-    POOR_SCENT = "PoorScent"
-    LEAVING_PATCH = "LeavingPatch"
-    FORAGING_SUCCESS = "ForagingSuccess"
+# Cognitive labels based on Information Foraging Theory. A Literal is checked
+# by pydantic-core as a string set lookup instead of constructing an Enum.
+CognitiveLabel = Literal[
+    "FollowingScent",
+    "ApproachingSource",
+    "DietEnrichment",
+    "PoorScent",
+    "LeavingPatch",
+    "ForagingSuccess",
+]
+COGNITIVE_LABELS: FrozenSet[str] = frozenset(get_args(CognitiveLabel))
+
+# Response models are assembled once from pipeline output and never mutated
+RESPONSE_MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True)
+
+# Named constants for code written against the former enum members
+CognitiveLabels = SimpleNamespace(
+    FOLLOWING_SCENT="FollowingScent",
+    APPROACHING_SOURCE="ApproachingSource",
+    DIET_ENRICHMENT="DietEnrichment",
+    POOR_SCENT="PoorScent",
+    LEAVING_PATCH="LeavingPatch",
+    FORAGING_SUCCESS="ForagingSuccess",
+)
 
 
 class EventData(BaseModel):
@@ -34,16 +52,20 @@ class AnnotationRequest(BaseModel):
     use_full_pipeline: bool = Field(default=True, description="Use multi-agent framework (slower, more accurate) vs pre-trained model")
 
 
-class AgentDecision(BaseModel):
+# A TypedDict, as it only appears nested in AnnotatedEvent: pydantic-core
+# validates it as a dict without building a model instance per decision
+class AgentDecision(TypedDict):
     """Decision made by an agent in the multi-agent framework"""
-    agent_name: str = Field(..., description="analyst, critic, or judge")
+    agent_name: Annotated[str, Field(description="analyst, critic, or judge")]
     label: CognitiveLabel
     justification: str
-    confidence: Optional[float] = None
+    confidence: NotRequired[Optional[float]]
 
 
 class AnnotatedEvent(BaseModel):
     """Event with cognitive annotation"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     event_id: str
     cognitive_label: CognitiveLabel
     agent_decisions: List[AgentDecision] = Field(
@@ -56,6 +78,8 @@ class AnnotatedEvent(BaseModel):
 
 class AnnotationResponse(BaseModel):
     """Response containing annotated session"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     session_id: str
     annotated_events: List[AnnotatedEvent]
     processing_time: float = Field(..., description="Time in seconds")
@@ -71,6 +95,14 @@ class BatchAnnotationRequest(BaseModel):
     priority: int = Field(default=0, description="Higher priority jobs processed first")
 
 
+# Adapters are built once here; constructing one compiles its core schema
+EVENTS_ADAPTER = TypeAdapter(List[EventData])
+ANNOTATION_REQUEST_ADAPTER = TypeAdapter(AnnotationRequest)
+# An agent labels a whole session in one prompt and replies with one JSON
+# object per event; field names differ by agent role, so only the shape is checked
+BATCHED_AGENT_RESPONSE_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+
 class SessionHandlingStrategy(str, Enum):
     """Strategy for handling long sessions"""
     TRUNCATE = "truncate"
@@ -146,6 +178,12 @@ class LLMConfigSchema(BaseModel):
         le=100,
         description="Number of events for sliding window strategy"
     )
+    max_concurrent_sessions: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=64,
+        description="Sessions annotated concurrently (defaults to the server setting)"
+    )
     
     # Model parameters
     temperature: float = Field(
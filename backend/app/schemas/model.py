@@ -4,11 +4,13 @@ Pydantic schemas for model information and predictions
 
 from pydantic import BaseModel
 from typing import List, Dict
-from app.schemas.annotation import EventData, CognitiveLabel
+from app.schemas.annotation import EventData, CognitiveLabel, RESPONSE_MODEL_CONFIG
 
 
 class ModelInfo(BaseModel):
     """Information about the pre-trained model"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     model_name: str
     version: str
     architecture: str
@@ -26,6 +28,8 @@ class PredictionRequest(BaseModel):
 
 class EventPrediction(BaseModel):
     """Predicted label for an event"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     event_id: str
     predicted_label: CognitiveLabel
     confidence: float
@@ -33,6 +37,8 @@ class EventPrediction(BaseModel):
 
 class PredictionResponse(BaseModel):
     """Response containing predictions"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     session_id: str
     predictions: List[EventPrediction]
     processing_time: float
@@ -3,12 +3,14 @@ Pydantic schemas for session data
 """
 
 from pydantic import BaseModel
-from typing import List, Optional
-from app.schemas.annotation import AnnotatedEvent
+from typing import List, Dict, Any, Optional
+from app.schemas.annotation import AnnotatedEvent, RESPONSE_MODEL_CONFIG
 
 
 class SessionResponse(BaseModel):
     """Response containing session details"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     session_id: str
     dataset: str
     user_id: Optional[str] = None
@@ -20,6 +22,8 @@ class SessionResponse(BaseModel):
 
 class SessionSummary(BaseModel):
     """Summary of a session for list views"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     session_id: str
     dataset: str
     num_events: int
@@ -29,8 +33,18 @@ class SessionSummary(BaseModel):
 
 class SessionListResponse(BaseModel):
     """Response for paginated session list"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     sessions: List[SessionSummary]
     total: int
     skip: int
     limit: int
 
+    @classmethod
+    def build(cls, sessions: List[Dict[str, Any]], **fields: Any) -> "SessionListResponse":
+        """Construct from stored session summaries without validation"""
+        return cls.model_construct(
+            sessions=[SessionSummary.model_construct(**session) for session in sessions],
+            **fields
+        )
+
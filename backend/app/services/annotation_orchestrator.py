@@ -3,16 +3,208 @@ Annotation orchestrator with progress tracking, checkpoints, and incremental wri
 """
 
 import asyncio
+import csv
+import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
 from pathlib import Path
+import aiofiles
 import numpy as np
+import orjson
+import torch
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from app.core.config import settings
 from app.services.llm_agents import AnalystAgent, CriticAgent, JudgeAgent, LLMConfig
+from app.services.quantized_encoder import load_int8_encoder
+
+
+# One traces CSV row from an annotated event, in _write_csv_header's column
+# order. _annotate_session sets every key, so one C-level getter replaces the
+# per-column subscripts and .get defaults.
+_CSV_ROW = itemgetter(
+    'session_id', 'event_id', 'timestamp', 'action_type', 'content',
+    'cognitive_label', 'analyst_label', 'analyst_justification',
+    'critic_label', 'critic_agreement', 'critic_justification',
+    'judge_justification', 'confidence_score', 'disagreement_score',
+    'flagged_for_review',
+    'user_override', 'override_version', 'override_timestamp'
+)
+
+# Disagreement scoring runs here, off the event loop. A single thread
+# serialises every job's encoder use, so lazy model loads and the embedding
+# caches need no locking and concurrent encodes do not fight for cores.
+_EMBED_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embed')
+
+# CSV appends and checkpoint writes leave the event loop through this thread,
+# so the next session's LLM calls start while they hit the disk. One worker
+# keeps each file's writes in submission order.
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='orchestrator-io')
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write data next to path and swap it in atomically"""
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _scan_csv_rows(f, start: int, num_columns: int, session_column: int):
+    """
+    Yield (session_id, start, end) byte spans for the CSV rows of binary file
+    f from offset start on. session_id is None for a row that is torn or has
+    the wrong number of columns.
+    """
+    pos = start
+    last_line = ''
+    
+    def lines():
+        nonlocal pos, last_line
+        for raw in f:
+            pos += len(raw)
+            last_line = raw.decode('utf-8', errors='replace')
+            yield last_line
+    
+    reader = csv.reader(lines())
+    row_start = start
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            # A quoted field cut off by the end of the file
+            yield None, row_start, pos
+            return
+        complete = last_line.endswith('\n') and len(row) == num_columns
+        yield (row[session_column] if complete else None), row_start, pos
+        row_start = pos
+
+
+def _truncate_undurable_rows(output_file: Path, durable_session_ids: set) -> int:
+    """
+    Remove rows of sessions the checkpoint does not record from a job's CSV
+
+    The append buffer reaches the disk whenever it fills, so after a crash
+    the file can end in rows, the last one possibly torn, of sessions that
+    are about to be annotated again. Flushes are checkpointed in the order
+    they were written, so durable rows form a prefix and the file is simply
+    truncated after it. Only if a failed checkpoint write left other rows
+    inside that prefix is the file rewritten, copying kept rows byte for
+    byte. Returns the number of rows removed.
+    """
+    with open(output_file, 'rb') as f:
+        header_line = f.readline()
+        if not header_line.endswith(b'\n'):
+            return 0
+        header = next(csv.reader([header_line.decode('utf-8')]))
+        if 'session_id' not in header:
+            return 0
+        
+        # Contiguous byte ranges of durable rows
+        kept: List[List[int]] = []
+        dropped = 0
+        interleaved = False
+        for session_id, row_start, row_end in _scan_csv_rows(
+            f, len(header_line), len(header), header.index('session_id')
+        ):
+            if session_id is not None and session_id in durable_session_ids:
+                interleaved = interleaved or dropped > 0
+                if kept and kept[-1][1] == row_start:
+                    kept[-1][1] = row_end
+                else:
+                    kept.append([row_start, row_end])
+            else:
+                dropped += 1
+    
+    if not dropped:
+        return 0
+    if not interleaved:
+        os.truncate(output_file, kept[-1][1] if kept else len(header_line))
+        return dropped
+    
+    tmp_path = output_file.with_suffix('.tmp')
+    try:
+        with open(output_file, 'rb') as src, open(tmp_path, 'wb') as dst:
+            dst.write(header_line)
+            for range_start, range_end in kept:
+                src.seek(range_start)
+                remaining = range_end - range_start
+                while remaining:
+                    chunk = src.read(min(remaining, 1 << 20))
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+        os.replace(tmp_path, output_file)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return dropped
+
+
+def _load_saved_result(log_file: Path, num_events: int) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild a session's annotation result from the log it saved before its
+    rows became durable, or None if the log is unreadable or incomplete
+    """
+    try:
+        log = orjson.loads(log_file.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    events = log.get('events')
+    if 'error' in log or not isinstance(events, list) or len(events) != num_events:
+        return None
+    return {
+        'session_id': log['session_id'],
+        'annotated_events': events,
+        'flagged_for_review': log.get('flagged_for_review', False),
+        'log': log
+    }
+
+
+def _append_file(path: Path, data: bytes) -> None:
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def _compact_checkpoint(checkpoint_path: Path, data: bytes) -> None:
+    """Replace the checkpoint, then drop the WAL it now includes"""
+    _replace_file(checkpoint_path, data)
+    checkpoint_wal_path(checkpoint_path).unlink(missing_ok=True)
+
+
+def checkpoint_wal_path(checkpoint_path: Path) -> Path:
+    """Append-only log of session IDs completed since the checkpoint was written"""
+    return checkpoint_path.with_suffix('.wal')
+
+
+def load_checkpoint(checkpoint_path: Path) -> Dict[str, Any]:
+    """
+    Read a job checkpoint, with completed_sessions extended by its WAL.
+    A crash between compaction and WAL removal can repeat IDs; they are dropped.
+    """
+    checkpoint = orjson.loads(checkpoint_path.read_bytes())
+    try:
+        wal = checkpoint_wal_path(checkpoint_path).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return checkpoint
+    completed = checkpoint.get('completed_sessions', [])
+    checkpoint['completed_sessions'] = list(dict.fromkeys(completed + wal.splitlines()))
+    return checkpoint
+
+
+# Stands in for a decision an agent did not return for an event
+_MISSING_DECISION: Dict[str, Any] = {
+    'label': 'Unknown',
+    'justification': '',
+    'agreement': 0,
+    'confidence': 0.0,
+}
 
 
 class AnnotationOrchestrator:
@@ -50,6 +242,12 @@ class AnnotationOrchestrator:
         self.similarity_model = None
         self.similarity_model_loaded: bool = False
         self.similarity_model_error: Optional[str] = None
+        # Justification embeddings by text digest, LRU-bounded. Boilerplate
+        # justifications repeat across events and resumed sessions. The
+        # cache lives and dies with this orchestrator's one similarity model.
+        # Entries are kept on the CPU so a full cache does not pin GPU memory.
+        self._emb_cache: "OrderedDict[bytes, torch.Tensor]" = OrderedDict()
+        self._emb_cache_max = 100_000
         
         # Progress tracking
         self.progress = {
@@ -62,10 +260,28 @@ class AnnotationOrchestrator:
             'flagged_sessions': []
         }
         
-        # Session logs
-        self.session_logs = {}
+        # Session logs, LRU-bounded; the log files on disk are authoritative
+        self.session_logs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._log_cache_max = 256
         # Session event counts (session_id -> number of events)
         self.session_event_counts = {}
+        
+        # Buffered append handle for the job's traces CSV, opened lazily and
+        # kept across sessions. csv_lock serializes appends with anything that
+        # rewrites the file in place (e.g. resolving flagged sessions).
+        self.csv_lock = threading.Lock()
+        self._csv_append_path: Optional[Path] = None
+        self._csv_append_fh = None
+        self._csv_append_writer = None
+        # Sessions appended since the last flush; see _append_to_csv
+        self._csv_unflushed_ids: List[str] = []
+        # Completed-session count in the last full checkpoint; later ones are in the WAL
+        self._checkpointed_sessions = -1
+        
+        # Progress listeners as (event loop, asyncio.Event) pairs. The job runs
+        # on its own thread, so listeners are woken via call_soon_threadsafe.
+        self._progress_listeners = set()
+        self._listeners_lock = threading.Lock()
     
     async def annotate_dataset(
         self,
@@ -95,6 +311,9 @@ class AnnotationOrchestrator:
             checkpoint = self._load_checkpoint(checkpoint_path)
             completed_session_ids = set(checkpoint.get('completed_sessions', []))
             self.progress['completed_sessions'] = len(completed_session_ids)
+        # The subset of completed sessions whose CSV rows are known to be on disk
+        durable_session_ids = set(completed_session_ids)
+        self._notify_progress()
         
         # Create job-specific directory
         job_dir = self.output_dir / job_id
@@ -110,6 +329,18 @@ class AnnotationOrchestrator:
         # Write CSV header if file doesn't exist
         if not output_file.exists():
             self._write_csv_header(output_file)
+        else:
+            dropped = await asyncio.get_running_loop().run_in_executor(
+                _IO_EXECUTOR, _truncate_undurable_rows, output_file, durable_session_ids
+            )
+            if dropped:
+                print(f"[INFO] Dropped {dropped} CSV rows of sessions missing from the checkpoint")
+        
+        # Sessions that saved their log but whose rows were lost with the
+        # append buffer; their annotations are reused, not requested again
+        saved_log_ids = {
+            log_file.name[:-len('_log.json')] for log_file in logs_dir.glob('*_log.json')
+        } - completed_session_ids
         
         print(f"[INFO] Output directory: {job_dir}")
         print(f"[INFO] Output file: {output_file}")
@@ -118,23 +349,17 @@ class AnnotationOrchestrator:
         # Process each session
         flagged_sessions = []
         
-        for session in sessions:
-            # Check if stop was requested
-            if self.progress['stop_requested']:
-                print(f"[INFO] Stop requested. Stopping annotation job {job_id}")
-                self.progress['status'] = 'stopped'
-                self.progress['current_session'] = None
-                break
-            
+        async def process_session(session: Dict[str, Any]):
             session_id = session['session_id']
             
             # Skip if already completed
             if session_id in completed_session_ids:
-                continue
+                return
             
             try:
                 self.progress['current_session'] = session_id
                 self.progress['status'] = f'processing {session_id}'
+                self._notify_progress()
                 
                 # Record event count for UI
                 try:
@@ -143,10 +368,23 @@ class AnnotationOrchestrator:
                     self.session_event_counts[session_id] = 0
 
                 # Annotate session
-                result = await self._annotate_session(session, job_id, logs_dir)
+                result = None
+                if session_id in saved_log_ids:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        _IO_EXECUTOR,
+                        _load_saved_result,
+                        logs_dir / f"{session_id}_log.json",
+                        len(session.get('events', []))
+                    )
+                    if result is not None:
+                        self._cache_log(session_id, result['log'])
+                if result is None:
+                    result = await self._annotate_session(session, job_id, logs_dir)
                 
                 # Write results incrementally
-                self._append_to_csv(output_file, result)
+                flushed_ids = await asyncio.get_running_loop().run_in_executor(
+                    _IO_EXECUTOR, self._append_to_csv, output_file, result
+                )
                 
                 # Check for disagreements
                 if result.get('flagged_for_review'):
@@ -158,18 +396,51 @@ class AnnotationOrchestrator:
                 self.progress['completed_sessions'] += 1
                 completed_session_ids.add(session_id)
                 
-                # Save checkpoint
-                self._save_checkpoint(
-                    checkpoint_path,
-                    completed_session_ids,
-                    self.progress
-                )
+                # Checkpoint only sessions whose rows are on disk. Other
+                # sessions may complete while this one awaits its write, so
+                # the flush reports exactly which sessions it covered.
+                if flushed_ids:
+                    durable_session_ids.update(flushed_ids)
+                    await self._save_checkpoint(
+                        checkpoint_path,
+                        durable_session_ids,
+                        self.progress,
+                        flushed_ids
+                    )
+                self._notify_progress()
                 
             except Exception as e:
                 error_msg = f"Error processing session {session_id}: {str(e)}"
                 self.progress['errors'].append(error_msg)
                 print(f"[ERROR] {error_msg}")
-                continue
+                self._notify_progress()
+        
+        # Sessions are independent, so several run at once; within a session the
+        # analyst, critic and judge calls stay sequential as each needs the
+        # previous output. Workers share one iterator, so every session is
+        # taken exactly once.
+        pending_sessions = iter(sessions)
+        
+        async def session_worker():
+            for session in pending_sessions:
+                # Check if stop was requested
+                if self.progress['stop_requested']:
+                    print(f"[INFO] Stop requested. Stopping annotation job {job_id}")
+                    self.progress['status'] = 'stopped'
+                    self.progress['current_session'] = None
+                    return
+                await process_session(session)
+        
+        # The worker count is the in-flight window: a worker takes the next
+        # session only when its previous one is done
+        window = self.config.max_concurrent_sessions or settings.MAX_CONCURRENT_SESSIONS
+        workers = max(1, min(window, len(sessions)))
+        await asyncio.gather(*(session_worker() for _ in range(workers)))
+        
+        # Release the append handle; later writers reopen the file
+        self.close_csv_writer()
+        # Every appended row is flushed now; record the sessions since the last flush
+        await self._save_checkpoint(checkpoint_path, completed_session_ids, self.progress)
         
         # Final status
         if not self.progress['stop_requested']:
@@ -197,6 +468,7 @@ class AnnotationOrchestrator:
             json.dump(summary, f, indent=2)
         
         print(f"[INFO] Summary saved to: {summary_file}")
+        self._notify_progress()
         
         return summary
     
@@ -259,8 +531,11 @@ class AnnotationOrchestrator:
                 'decisions': critic_result['decisions']
             })
             
-            # Calculate disagreement scores
-            disagreement_scores = self._calculate_disagreement(
+            # Calculate disagreement scores. Encoding is CPU/GPU bound, so it runs
+            # off the event loop while other sessions' LLM calls are in flight.
+            disagreement_scores = await asyncio.get_running_loop().run_in_executor(
+                _EMBED_EXECUTOR,
+                self._calculate_disagreement,
                 analyst_result['decisions'],
                 critic_result['decisions']
             )
@@ -311,48 +586,63 @@ class AnnotationOrchestrator:
             max_disagreement = max(disagreement_scores) if disagreement_scores else 0
             flagged_for_review = max_disagreement > 0.75  # Top 25% - adjust threshold as needed
             
-            # Build annotated events (guard against length mismatches)
-            annotated_events = []
-            analyst_decisions = analyst_result.get('decisions', [])
-            critic_decisions = critic_result.get('decisions', [])
-            judge_decisions = judge_result.get('decisions', [])
-
-            for i, event in enumerate(events):
-                has_analyst = i < len(analyst_decisions)
-                has_critic = i < len(critic_decisions)
-                has_judge = i < len(judge_decisions)
-                annotated_event = {
+            # Build annotated events. Agents may return fewer decisions than
+            # events; pad each list once so the per-event build needs no guards.
+            n = len(events)
+            analyst_decisions = analyst_result.get('decisions', [])[:n]
+            critic_decisions = critic_result.get('decisions', [])[:n]
+            judge_decisions = judge_result.get('decisions', [])[:n]
+            n_analyst, n_critic, n_judge = len(analyst_decisions), len(critic_decisions), len(judge_decisions)
+            
+            # Final label: judge, else critic, else analyst, else Unknown
+            cognitive_labels = [d['final_label'] for d in judge_decisions]
+            cognitive_labels += [d['label'] for d in critic_decisions[n_judge:]]
+            cognitive_labels += [d['label'] for d in analyst_decisions[max(n_judge, n_critic):]]
+            cognitive_labels += ['Unknown'] * (n - len(cognitive_labels))
+            
+            analyst_decisions = analyst_decisions + [_MISSING_DECISION] * (n - n_analyst)
+            critic_decisions = critic_decisions + [_MISSING_DECISION] * (n - n_critic)
+            judge_decisions = judge_decisions + [_MISSING_DECISION] * (n - n_judge)
+            scores = disagreement_scores[:n] + [0] * (n - len(disagreement_scores))
+            override_timestamp = datetime.now().isoformat()
+            
+            annotated_events = [
+                {
                     'session_id': session_id,
                     'event_id': event['event_id'],
                     'timestamp': event['timestamp'],
                     'action_type': event['action_type'],
                     'content': event['content'],
-                    'cognitive_label': judge_decisions[i]['final_label'] if has_judge else (critic_decisions[i]['label'] if has_critic else (analyst_decisions[i]['label'] if has_analyst else 'Unknown')),
-                    'analyst_label': analyst_decisions[i]['label'] if has_analyst else 'Unknown',
-                    'analyst_justification': analyst_decisions[i].get('justification', '') if has_analyst else '',
-                    'critic_label': critic_decisions[i]['label'] if has_critic else 'Unknown',
-                    'critic_agreement': critic_decisions[i].get('agreement', 0) if has_critic else 0,
-                    'critic_justification': critic_decisions[i].get('justification', '') if has_critic else '',
-                    'judge_justification': judge_decisions[i].get('justification', '') if has_judge else '',
-                    'confidence_score': judge_decisions[i].get('confidence', 0.0) if has_judge else 0.0,
-                    'disagreement_score': disagreement_scores[i] if i < len(disagreement_scores) else 0,
-                    'flagged_for_review': (disagreement_scores[i] > 0.75) if i < len(disagreement_scores) else False,
+                    'cognitive_label': cognitive_label,
+                    'analyst_label': analyst['label'],
+                    'analyst_justification': analyst.get('justification', ''),
+                    'critic_label': critic['label'],
+                    'critic_agreement': critic.get('agreement', 0),
+                    'critic_justification': critic.get('justification', ''),
+                    'judge_justification': judge.get('justification', ''),
+                    'confidence_score': judge.get('confidence', 0.0),
+                    'disagreement_score': score,
+                    'flagged_for_review': score > 0.75,
                     # Versioning fields for non-destructive overrides
                     'user_override': False,
                     'override_version': 1,
-                    'override_timestamp': datetime.now().isoformat()
+                    'override_timestamp': override_timestamp
                 }
-                annotated_events.append(annotated_event)
+                for event, cognitive_label, analyst, critic, judge, score in zip(
+                    events, cognitive_labels, analyst_decisions, critic_decisions, judge_decisions, scores
+                )
+            ]
             
             log['events'] = annotated_events
             log['flagged_for_review'] = flagged_for_review
             log['max_disagreement'] = max_disagreement
             
             # Save log
-            self.session_logs[session_id] = log
+            self._cache_log(session_id, log)
             log_file = logs_dir / f"{session_id}_log.json"
-            with open(log_file, 'w') as f:
-                json.dump(log, f, indent=2)
+            log_bytes = orjson.dumps(log, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+            async with aiofiles.open(log_file, 'wb') as f:
+                await f.write(log_bytes)
             
             print(f"[INFO] Saved log to: {log_file}")
             
@@ -383,11 +673,20 @@ class AnnotationOrchestrator:
             # Lazy load similarity model
             if self.similarity_model is None:
                 try:
-                    print("[DISAGREEMENT] Loading SentenceTransformer 'all-MiniLM-L6-v2'...")
-                    self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
+                    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+                    if device == 'cpu':
+                        # Intra-op threads past ~8 stop paying off for a model this small
+                        torch.set_num_threads(min(8, os.cpu_count() or 4))
+                        # Without a GPU, prefer the int8 ONNX export when optimum is installed
+                        self.similarity_model = load_int8_encoder()
+                    if self.similarity_model is None:
+                        print(f"[DISAGREEMENT] Loading SentenceTransformer 'all-MiniLM-L6-v2' on {device}...")
+                        self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+                    # First encode pays for CUDA context and kernel setup
+                    self.similarity_model.encode(["warmup"], show_progress_bar=False)
                     self.similarity_model_loaded = True
                     self.similarity_model_error = None
-                    print("[DISAGREEMENT] SentenceTransformer loaded successfully.")
+                    print(f"[DISAGREEMENT] {type(self.similarity_model).__name__} loaded successfully.")
                 except Exception as load_err:
                     self.similarity_model = None
                     self.similarity_model_loaded = False
@@ -396,23 +695,41 @@ class AnnotationOrchestrator:
                     # Early return zeros so pipeline continues without flags
                     return [0.0] * len(analyst_decisions)
             
-            disagreement_scores = []
+            # zip semantics: score only the events both agents returned
+            n = min(len(analyst_decisions), len(critic_decisions))
+            if n == 0:
+                return []
+            analyst_decisions = analyst_decisions[:n]
+            critic_decisions = critic_decisions[:n]
             
-            for analyst, critic in zip(analyst_decisions, critic_decisions):
-                # Label disagreement
-                label_disagree = 1.0 if analyst['label'] != critic['label'] else 0.0
-                
-                # Semantic disagreement in justifications
-                analyst_text = analyst['justification']
-                critic_text = critic['justification']
-                
-                embeddings = self.similarity_model.encode([analyst_text, critic_text])
-                similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-                semantic_disagree = 1.0 - similarity  # Convert similarity to disagreement
-                
-                # Combined score (weighted)
-                total_disagreement = 0.6 * label_disagree + 0.4 * semantic_disagree
-                disagreement_scores.append(float(total_disagreement))
+            # Label disagreement
+            analyst_labels = np.fromiter((a['label'] for a in analyst_decisions), dtype=object, count=n)
+            critic_labels = np.fromiter((c['label'] for c in critic_decisions), dtype=object, count=n)
+            label_disagree = (analyst_labels != critic_labels).astype(np.float64)
+            
+            # Semantic disagreement in justifications, only where the labels
+            # differ: an agreeing event scores at most 0.4, far below the 0.75
+            # review threshold, so its justifications are not encoded at all
+            semantic_disagree = np.zeros(n)
+            mismatched = np.flatnonzero(label_disagree)
+            if mismatched.size:
+                # One padded batch; unit-length embeddings make cosine a
+                # row-wise dot, computed on the model's device
+                texts = [analyst_decisions[i]['justification'] for i in mismatched]
+                texts += [critic_decisions[i]['justification'] for i in mismatched]
+                try:
+                    embeddings = self._encode_justifications(texts)
+                    m = mismatched.size
+                    similarity = torch.sum(embeddings[:m] * embeddings[m:], dim=1).cpu().numpy()
+                    semantic_disagree[mismatched] = 1.0 - similarity  # Convert similarity to disagreement
+                except Exception as e:
+                    # Mismatches that cannot be scored go to review instead of passing silently
+                    self.similarity_model_error = f"Semantic scoring failed: {e}"
+                    print(f"[DISAGREEMENT][ERROR] Semantic scoring failed, flagging label mismatches: {e}")
+                    semantic_disagree[mismatched] = 1.0
+            
+            # Combined score (weighted)
+            disagreement_scores = (0.6 * label_disagree + 0.4 * semantic_disagree).tolist()
             
             return disagreement_scores
             
@@ -420,6 +737,34 @@ class AnnotationOrchestrator:
             print(f"[DISAGREEMENT][ERROR] Error calculating disagreement: {e}")
             return [0.0] * len(analyst_decisions)
     
+    def _encode_justifications(self, texts: List[str]) -> torch.Tensor:
+        """Unit-length embeddings for texts, encoding only those not cached"""
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        misses: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in self._emb_cache:
+                self._emb_cache.move_to_end(key)
+            else:
+                misses.setdefault(key, text)
+        
+        if misses:
+            encoded = self.similarity_model.encode(
+                list(misses.values()),
+                batch_size=128,
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            # Clone each row: a view would keep its whole batch's storage alive
+            self._emb_cache.update(zip(misses, (row.clone() for row in encoded.cpu())))
+        
+        embeddings = torch.stack([self._emb_cache[key] for key in keys]).to(
+            self.similarity_model.device
+        )
+        while len(self._emb_cache) > self._emb_cache_max:
+            self._emb_cache.popitem(last=False)
+        return embeddings
+    
     def _write_csv_header(self, output_file: Path):
         """Write CSV header"""
         header = [
@@ -435,44 +780,96 @@ class AnnotationOrchestrator:
         with open(output_file, 'w') as f:
             f.write(','.join(header) + '\n')
     
-    def _append_to_csv(self, output_file: Path, result: Dict[str, Any]):
-        """Append annotated events to CSV file"""
-        import csv
-        
-        with open(output_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-            
-            for event in result['annotated_events']:
-                row = [
-                    event['session_id'],
-                    event['event_id'],
-                    event['timestamp'],
-                    event['action_type'],
-                    event['content'][:500],  # Truncate long content
-                    event['cognitive_label'],
-                    event['analyst_label'],
-                    event['analyst_justification'][:500],
-                    event['critic_label'],
-                    event['critic_agreement'],
-                    event['critic_justification'][:500],
-                    event['judge_justification'][:500],
-                    event['confidence_score'],
-                    event['disagreement_score'],
-                    event.get('flagged_for_review', False),
-                    # New versioning/audit columns (with safe defaults)
-                    event.get('user_override', False),
-                    event.get('override_version', 1),
-                    event.get('override_timestamp', datetime.now().isoformat())
-                ]
-                writer.writerow(row)
+    def _get_csv_writer(self, output_file: Path):
+        """Return the buffered append writer for output_file, opening it if needed"""
+        if self._csv_append_path != output_file:
+            self._close_csv_append()
+            self._csv_append_fh = open(
+                output_file, 'a', newline='', encoding='utf-8', buffering=1 << 20
+            )
+            self._csv_append_writer = csv.writer(self._csv_append_fh, quoting=csv.QUOTE_ALL)
+            self._csv_append_path = output_file
+        return self._csv_append_writer
+    
+    def _close_csv_append(self):
+        """Flush and close the append handle. Caller must hold csv_lock."""
+        if self._csv_append_fh is not None:
+            try:
+                self._csv_append_fh.close()
+            finally:
+                self._csv_append_fh = None
+                self._csv_append_writer = None
+                self._csv_append_path = None
+    
+    def close_csv_writer(self):
+        """Flush and close the append handle so the CSV can be safely rewritten"""
+        with self.csv_lock:
+            self._close_csv_append()
+    
+    @contextmanager
+    def exclusive_csv(self):
+        """Hold off appends and release the handle while the CSV is replaced"""
+        with self.csv_lock:
+            self._close_csv_append()
+            yield
+    
+    def _append_to_csv(self, output_file: Path, result: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Append annotated events to CSV file
+
+        The buffer is flushed every CSV_FLUSH_SESSIONS sessions rather than
+        after each one. Returns the session IDs appended since the previous
+        flush if this call flushed, else None.
+        """
+        rows = []
+        for event in result['annotated_events']:
+            row = list(_CSV_ROW(event))
+            # Truncate long text columns
+            row[4] = row[4][:500]
+            row[7] = row[7][:500]
+            row[10] = row[10][:500]
+            row[11] = row[11][:500]
+            rows.append(row)
+        
+        with self.csv_lock:
+            self._get_csv_writer(output_file).writerows(rows)
+            self._csv_unflushed_ids.append(result['session_id'])
+            if len(self._csv_unflushed_ids) < settings.CSV_FLUSH_SESSIONS:
+                return None
+            self._csv_append_fh.flush()
+            flushed_ids, self._csv_unflushed_ids = self._csv_unflushed_ids, []
+            return flushed_ids
     
-    def _save_checkpoint(
+    async def _save_checkpoint(
         self,
         checkpoint_path: Path,
         completed_sessions: set,
-        progress: Dict[str, Any]
+        progress: Dict[str, Any],
+        new_session_ids: Optional[List[str]] = None
     ):
-        """Save checkpoint for recovery"""
+        """
+        Save checkpoint for recovery
+
+        new_session_ids are appended to the checkpoint's WAL, so the full
+        JSON (completed list, progress, config) is only rewritten on the
+        first save, every CHECKPOINT_COMPACT_SESSIONS sessions and when
+        called without new IDs at the end of a job. That rewrite is skipped
+        if nothing completed since the last one, and is atomic.
+        """
+        if (
+            new_session_ids
+            and self._checkpointed_sessions >= 0
+            and len(completed_sessions) - self._checkpointed_sessions < settings.CHECKPOINT_COMPACT_SESSIONS
+        ):
+            data = ''.join(f"{session_id}\n" for session_id in new_session_ids).encode('utf-8')
+            await asyncio.get_running_loop().run_in_executor(
+                _IO_EXECUTOR, _append_file, checkpoint_wal_path(checkpoint_path), data
+            )
+            return
+        
+        if len(completed_sessions) == self._checkpointed_sessions:
+            return
+        
         # Save config as dict for restoration
         config_dict = {
             'analyst_model': self.config.analyst_model,
@@ -491,6 +888,7 @@ class AnnotationOrchestrator:
             'session_strategy': self.config.session_strategy.value if hasattr(self.config.session_strategy, 'value') else str(self.config.session_strategy),
             'temperature': self.config.temperature,
             'window_size': self.config.window_size,
+            'max_concurrent_sessions': self.config.max_concurrent_sessions,
         }
         
         checkpoint = {
@@ -500,22 +898,39 @@ class AnnotationOrchestrator:
             'timestamp': datetime.now().isoformat()
         }
         
-        with open(checkpoint_path, 'w') as f:
-            json.dump(checkpoint, f, indent=2)
+        # Encode here, while the set and progress cannot change underneath;
+        # only the file write goes to the I/O thread
+        data = orjson.dumps(checkpoint)
+        self._checkpointed_sessions = len(completed_sessions)
+        await asyncio.get_running_loop().run_in_executor(
+            _IO_EXECUTOR, _compact_checkpoint, checkpoint_path, data
+        )
     
     def _load_checkpoint(self, checkpoint_path: Path) -> Dict[str, Any]:
         """Load checkpoint"""
-        with open(checkpoint_path, 'r') as f:
-            return json.load(f)
+        return load_checkpoint(checkpoint_path)
     
     def get_progress(self) -> Dict[str, Any]:
-        """Get current progress"""
-        return self.progress.copy()
+        """
+        Get current progress
+
+        Safe to call from another thread while the job runs: the job only
+        appends to the lists, and copying a list or dict is atomic under the GIL.
+        """
+        progress = self.progress.copy()
+        progress['errors'] = list(progress['errors'])
+        progress['flagged_sessions'] = list(progress['flagged_sessions'])
+        return progress
+    
+    def get_session_event_counts(self) -> Dict[str, int]:
+        """Copy of the per-session event counts, safe to read from another thread"""
+        return dict(self.session_event_counts)
     
     def get_session_log(self, session_id: str, job_id: str) -> Optional[Dict[str, Any]]:
         """Get log for specific session"""
         # First check in-memory logs
         if session_id in self.session_logs:
+            self.session_logs.move_to_end(session_id)
             return self.session_logs[session_id]
         
         # Try to load from file if not in memory
@@ -523,10 +938,9 @@ class AnnotationOrchestrator:
         log_file = self.output_dir / job_id / "logs" / f"{session_id}_log.json"
         if log_file.exists():
             try:
-                with open(log_file, 'r') as f:
-                    log = json.load(f)
-                    self.session_logs[session_id] = log  # Cache it
-                    return log
+                log = orjson.loads(log_file.read_bytes())
+                self._cache_log(session_id, log)
+                return log
             except Exception as e:
                 print(f"Error loading log file {log_file}: {e}")
                 return None
@@ -534,10 +948,18 @@ class AnnotationOrchestrator:
         print(f"[WARN] Log file not found: {log_file}")
         return None
     
+    def _cache_log(self, session_id: str, log: Dict[str, Any]):
+        """Keep a session log in memory, evicting the least recently used"""
+        self.session_logs[session_id] = log
+        self.session_logs.move_to_end(session_id)
+        while len(self.session_logs) > self._log_cache_max:
+            self.session_logs.popitem(last=False)
+    
     def request_stop(self):
         """Request the annotation job to stop gracefully"""
         self.progress['stop_requested'] = True
         print(f"[INFO] Stop requested for annotation job")
+        self._notify_progress()
     
     def is_stopped(self) -> bool:
         """Check if the job was stopped"""
@@ -549,4 +971,40 @@ class AnnotationOrchestrator:
         if self.progress['status'] == 'stopped':
             self.progress['status'] = 'processing'
         print(f"[INFO] Stop flag reset, job ready to resume")
+        self._notify_progress()
+    
+    def add_progress_listener(self) -> asyncio.Event:
+        """
+        Register a listener on the calling event loop. The returned event is set
+        whenever progress changes; bursts of changes coalesce into one wakeup.
+        """
+        event = asyncio.Event()
+        with self._listeners_lock:
+            self._progress_listeners.add((asyncio.get_running_loop(), event))
+        return event
+    
+    def remove_progress_listener(self, event: asyncio.Event):
+        """Unregister a listener returned by add_progress_listener"""
+        with self._listeners_lock:
+            self._progress_listeners = {
+                (loop, ev) for loop, ev in self._progress_listeners if ev is not event
+            }
+    
+    def mark_failed(self, error: str):
+        """Record that annotate_dataset ended with an error and wake the listeners"""
+        self.progress['status'] = 'failed'
+        self.progress['current_session'] = None
+        self.progress['errors'].append(f"Job failed: {error}")
+        self._notify_progress()
+    
+    def _notify_progress(self):
+        """Wake all progress listeners on their own event loops"""
+        with self._listeners_lock:
+            listeners = list(self._progress_listeners)
+        for loop, event in listeners:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Listener's loop has been closed
+                self.remove_progress_listener(event)
 
@@ -3,17 +3,104 @@ Service for handling annotation operations
 """
 
 import uuid
+from collections import OrderedDict
 import asyncio
+import hashlib
 import threading
 import json
+import csv
+import os
+import tempfile
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterator, Tuple
+import aiofiles
+import orjson
 from fastapi import UploadFile
 
-from app.schemas.annotation import AnnotationRequest, BatchAnnotationRequest
+from app.core.config import settings
+from app.core.errors import ConflictError, InvalidInputError, NotFoundError
+from app.schemas.annotation import (
+    AnnotationRequest,
+    BatchAnnotationRequest,
+    EVENTS_ADAPTER
+)
 from app.services.file_parser import FileParser
 from app.services.llm_agents import LLMConfig
-from app.services.annotation_orchestrator import AnnotationOrchestrator
+from app.services.annotation_orchestrator import (
+    AnnotationOrchestrator,
+    checkpoint_wal_path,
+    load_checkpoint
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from an UploadFile per spool write
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+# CSV column -> (log event key, default) for events appended during a resolve
+_MISSING_ROW_FIELDS = {
+    'event_id': ('event_id', ''),
+    'event_timestamp': ('timestamp', ''),
+    'action_type': ('action_type', ''),
+    'content': ('content', ''),
+    'cognitive_label': ('cognitive_label', ''),
+    'analyst_label': ('analyst_label', ''),
+    'analyst_justification': ('analyst_justification', ''),
+    'critic_label': ('critic_label', ''),
+    'critic_agreement': ('critic_agreement', ''),
+    'critic_justification': ('critic_justification', ''),
+    'judge_justification': ('judge_justification', ''),
+    'confidence_score': ('confidence_score', 0),
+    'disagreement_score': ('disagreement_score', 0),
+    'flagged_for_review': ('flagged_for_review', False),
+    'user_override': ('user_override', False),
+    'override_version': ('override_version', 1),
+    'override_timestamp': ('override_timestamp', ''),
+}
+_MISSING_ROW_BOOL_COLUMNS = ('flagged_for_review', 'user_override')
+_BOOL_STR = {True: 'True', False: 'False'}
+
+_SESSION_ID = itemgetter('session_id')
+
+# Job statuses after which watch_job_status stops
+_FINAL_STATUSES = ('completed', 'stopped', 'failed', 'error')
+
+# Number of paginated dataset previews kept by get_dataset_info
+DATASET_INFO_CACHE_SIZE = 1024
+
+# get_job_status memo: seconds an entry stays valid, and entries kept
+STATUS_CACHE_TTL = 5.0
+STATUS_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class JobHandle:
+    """A started annotation job; read the orchestrator through its snapshot getters"""
+    orchestrator: AnnotationOrchestrator
+    session_ids: Tuple[str, ...]
+    future: Future
+
+
+def _stat_key(path: Path) -> Optional[tuple]:
+    """(mtime_ns, size) of a path, or None if it does not exist"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _make_etag(*parts: Any) -> str:
+    """Quoted strong ETag from the repr of the given parts"""
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
 
 
 class AnnotationService:
@@ -21,8 +108,43 @@ class AnnotationService:
     
     def __init__(self):
         self.file_parser = FileParser()
-        self.active_jobs = {}  # job_id -> orchestrator
-        self.uploaded_datasets = {}  # temp storage for uploaded data
+        # job_id -> JobHandle. Entries are only ever replaced whole, so one
+        # get() sees a consistent job from either thread.
+        self.active_jobs: Dict[str, JobHandle] = {}
+        # Shared by annotate_session calls; created on first use
+        self._single_session_orchestrator: Optional[AnnotationOrchestrator] = None
+        self.uploaded_datasets = {}  # dataset_id -> metadata, without parsed_data
+        # LRU of parsed datasets, bounded by DATASET_CACHE_EVENTS. Every
+        # dataset is persisted, so an evicted one is reloaded on next use.
+        self._parsed_datasets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._parsed_events = 0
+        # dataset_id -> pending reload, so concurrent misses share one read
+        self._parsed_loads: Dict[str, asyncio.Future] = {}
+        
+        # LRU of paginated dataset previews keyed by (dataset_id, page, limit).
+        # Uploaded datasets never change, so entries only need evicting by size.
+        self._dataset_info_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # job_id -> [lock serialising resolves, callers holding or awaiting it].
+        # Resolves all run on the server loop; an entry lives only while used.
+        self._resolve_locks: Dict[str, List[Any]] = {}
+        # job_id -> (expiry, ETag, status) of the last get_job_status answer
+        # for a running job, LRU-bounded by STATUS_CACHE_SIZE
+        self._status_cache: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        
+        # Dedicated pool for blocking file I/O so resolves neither stall the
+        # event loop nor compete with other users of the default executor
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=settings.IO_WORKERS, thread_name_prefix='annotation-io'
+        )
+        
+        # Every annotation job runs on this one long-lived loop, in its own
+        # thread, so requests are never blocked by a job and starting a job
+        # costs neither a thread nor a fresh event loop. Loop-bound state the
+        # jobs share (rate-limit buckets, the Redis pool) stays on one loop.
+        self._job_loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._job_loop.run_forever, name='annotation-jobs', daemon=True
+        ).start()
         
         # Setup paths (same as orchestrator)
         backend_dir = Path(__file__).resolve().parent.parent.parent
@@ -35,12 +157,15 @@ class AnnotationService:
         # Load persisted datasets on startup
         self._load_persisted_datasets()
     
-    def _persist_dataset(self, dataset_id: str):
+    def _persist_dataset(self, dataset_id: str, parsed_data: Dict[str, Any]):
         """Persist dataset to disk"""
         try:
             dataset_file = self.datasets_dir / f"{dataset_id}.json"
-            with open(dataset_file, 'w') as f:
-                json.dump(self.uploaded_datasets[dataset_id], f, indent=2, default=str)
+            dataset_file.write_bytes(orjson.dumps(
+                {**self.uploaded_datasets[dataset_id], 'parsed_data': parsed_data},
+                default=str,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
         except Exception as e:
             print(f"Warning: Failed to persist dataset {dataset_id}: {e}")
     
@@ -49,49 +174,112 @@ class AnnotationService:
         try:
             for dataset_file in self.datasets_dir.glob("*.json"):
                 try:
-                    with open(dataset_file, 'r') as f:
-                        dataset_id = dataset_file.stem
-                        self.uploaded_datasets[dataset_id] = json.load(f)
-                        print(f"Loaded persisted dataset: {dataset_id}")
+                    dataset_id = dataset_file.stem
+                    dataset = orjson.loads(dataset_file.read_bytes())
+                    self._cache_parsed_data(dataset_id, dataset.pop('parsed_data'))
+                    self.uploaded_datasets[dataset_id] = dataset
+                    print(f"Loaded persisted dataset: {dataset_id}")
                 except Exception as e:
                     print(f"Warning: Failed to load dataset {dataset_file}: {e}")
         except Exception as e:
             print(f"Warning: Failed to load persisted datasets: {e}")
     
+    def _cache_parsed_data(self, dataset_id: str, parsed_data: Dict[str, Any]):
+        """Keep a parsed dataset in memory, evicting the least recently used"""
+        old = self._parsed_datasets.pop(dataset_id, None)
+        if old is not None:
+            self._parsed_events -= old.get('total_events', 0)
+        self._parsed_datasets[dataset_id] = parsed_data
+        self._parsed_events += parsed_data.get('total_events', 0)
+        
+        # The newest dataset always stays, however large. One whose file
+        # failed to persist is the only copy, so it is never evicted.
+        for evict_id in list(self._parsed_datasets):
+            if self._parsed_events <= settings.DATASET_CACHE_EVENTS or evict_id == dataset_id:
+                break
+            if not (self.datasets_dir / f"{evict_id}.json").exists():
+                continue
+            evicted = self._parsed_datasets.pop(evict_id)
+            self._parsed_events -= evicted.get('total_events', 0)
+    
+    def _read_parsed_data(self, dataset_id: str) -> Dict[str, Any]:
+        """Load a persisted dataset's parsed sessions; blocking"""
+        dataset_file = self.datasets_dir / f"{dataset_id}.json"
+        return orjson.loads(dataset_file.read_bytes())['parsed_data']
+    
+    async def _get_parsed_data(self, dataset_id: str) -> Dict[str, Any]:
+        """Parsed sessions of an uploaded dataset, reloaded from disk if evicted"""
+        parsed_data = self._parsed_datasets.get(dataset_id)
+        if parsed_data is not None:
+            self._parsed_datasets.move_to_end(dataset_id)
+            return parsed_data
+        
+        # Read and decode on the IO pool; the whole file can be large
+        load = self._parsed_loads.get(dataset_id)
+        if load is None:
+            load = asyncio.get_running_loop().run_in_executor(
+                self._io_pool, self._read_parsed_data, dataset_id
+            )
+            self._parsed_loads[dataset_id] = load
+            load.add_done_callback(lambda _: self._parsed_loads.pop(dataset_id, None))
+        # Shielded so one cancelled caller does not cancel the others' load
+        parsed_data = await asyncio.shield(load)
+        self._cache_parsed_data(dataset_id, parsed_data)
+        return parsed_data
+    
     async def upload_dataset(self, file: UploadFile, dataset_type: str = "custom") -> Dict[str, Any]:
         """Upload and parse dataset file"""
+        filename = file.filename or ""
+        if not filename:
+            raise InvalidInputError("Uploaded file has no filename")
+        
+        loop = asyncio.get_running_loop()
+        # Spool the upload to disk in chunks rather than reading it whole
+        fd, tmp_path = tempfile.mkstemp(suffix=Path(filename).suffix)
+        os.close(fd)
         try:
-            # Read file content
-            content = await file.read()
-            
-            # Parse file
-            parsed_data = await self.file_parser.parse_file(content, file.filename)
-            
-            # Generate dataset ID
-            dataset_id = str(uuid.uuid4())
-            
-            # Store parsed data temporarily
-            self.uploaded_datasets[dataset_id] = {
-                'filename': file.filename,
-                'dataset_type': dataset_type,
-                'parsed_data': parsed_data,
-                'uploaded_at': None
-            }
-            
-            # Persist to disk
-            self._persist_dataset(dataset_id)
+            async with aiofiles.open(tmp_path, 'wb', executor=self._io_pool) as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
             
-            return {
-                'dataset_id': dataset_id,
-                'filename': file.filename,
-                'total_sessions': parsed_data['total_sessions'],
-                'total_events': parsed_data['total_events'],
-                'sessions': parsed_data['sessions'],
-                'dataset_info': parsed_data.get('dataset_info', {})
-            }
-            
-        except Exception as e:
-            raise Exception(f"Failed to upload dataset: {str(e)}")
+            # Parse file off the event loop so other requests keep being served
+            try:
+                parsed_data = await loop.run_in_executor(
+                    self._io_pool,
+                    self.file_parser.parse_file,
+                    Path(tmp_path),
+                    filename
+                )
+            except InvalidInputError:
+                raise
+            except Exception as e:
+                # Malformed content surfaces from pandas/orjson as assorted errors
+                raise InvalidInputError(f"Failed to parse {filename}: {e}") from e
+        finally:
+            os.unlink(tmp_path)
+        
+        # Generate dataset ID
+        dataset_id = str(uuid.uuid4())
+        
+        # Store parsed data temporarily
+        self.uploaded_datasets[dataset_id] = {
+            'filename': filename,
+            'dataset_type': dataset_type,
+            'uploaded_at': None
+        }
+        
+        # Persist to disk; serialising the whole dataset is the upload's largest write
+        await loop.run_in_executor(self._io_pool, self._persist_dataset, dataset_id, parsed_data)
+        self._cache_parsed_data(dataset_id, parsed_data)
+        
+        return {
+            'dataset_id': dataset_id,
+            'filename': filename,
+            'total_sessions': parsed_data['total_sessions'],
+            'total_events': parsed_data['total_events'],
+            'sessions': parsed_data['sessions'],
+            'dataset_info': parsed_data.get('dataset_info', {})
+        }
     
     async def start_annotation_job(
         self,
@@ -103,7 +291,7 @@ class AnnotationService:
         """Start annotation job for uploaded dataset"""
         
         if dataset_id not in self.uploaded_datasets:
-            raise ValueError(f"Dataset {dataset_id} not found")
+            raise NotFoundError(f"Dataset {dataset_id} not found")
         
         # Import SessionHandlingStrategy enum
         from app.services.llm_agents import SessionHandlingStrategy
@@ -146,6 +334,7 @@ class AnnotationService:
             # Session handling
             session_strategy=SessionHandlingStrategy(llm_config.get('session_strategy', 'truncate')),
             window_size=llm_config.get('window_size', 30),
+            max_concurrent_sessions=llm_config.get('max_concurrent_sessions'),
             
             # Model parameters
             temperature=llm_config.get('temperature', 0.7),
@@ -170,23 +359,16 @@ class AnnotationService:
         # Create orchestrator
         job_id = resume_job_id or str(uuid.uuid4())
         orchestrator = AnnotationOrchestrator(config)
-        self.active_jobs[job_id] = orchestrator
         
         # Get sessions
-        dataset = self.uploaded_datasets[dataset_id]
-        sessions = dataset['parsed_data']['sessions']
-        session_ids = [s['session_id'] for s in sessions]
+        sessions = (await self._get_parsed_data(dataset_id))['sessions']
+        session_ids = tuple(map(_SESSION_ID, sessions))
         
         # Store session list for this job
         self.uploaded_datasets[dataset_id]['job_sessions'] = session_ids
-        orchestrator.session_ids = session_ids  # Store in orchestrator for status retrieval
         
-        # Start annotation in a background thread to avoid blocking the event loop
-        def _run_annotation():
-            asyncio.run(orchestrator.annotate_dataset(sessions, job_id, dataset_name))
-
-        thread = threading.Thread(target=_run_annotation, daemon=True)
-        thread.start()
+        # Start annotation on the job loop to avoid blocking the event loop
+        self._start_job(job_id, orchestrator, session_ids, sessions, dataset_name)
         
         return {
             'job_id': job_id,
@@ -196,13 +378,47 @@ class AnnotationService:
             'session_ids': session_ids
         }
     
+    def _start_job(
+        self,
+        job_id: str,
+        orchestrator: AnnotationOrchestrator,
+        session_ids: Tuple[str, ...],
+        sessions: List[Dict[str, Any]],
+        dataset_name: str
+    ) -> JobHandle:
+        """Schedule annotate_dataset on the job loop and publish the job's handle"""
+        future = asyncio.run_coroutine_threadsafe(
+            orchestrator.annotate_dataset(sessions, job_id, dataset_name), self._job_loop
+        )
+        
+        def _on_done(done: Future):
+            self._status_cache.pop(job_id, None)
+            if done.cancelled():
+                orchestrator.mark_failed("cancelled")
+            elif done.exception() is not None:
+                logger.error("Annotation job %s failed", job_id, exc_info=done.exception())
+                orchestrator.mark_failed(str(done.exception()))
+        
+        future.add_done_callback(_on_done)
+        job = JobHandle(orchestrator, session_ids, future)
+        self.active_jobs[job_id] = job
+        return job
+    
     async def get_dataset_info(self, dataset_id: str, page: int = 1, limit: int = 10) -> Dict[str, Any]:
         """Get dataset information with paginated session preview"""
         if dataset_id not in self.uploaded_datasets:
-            raise ValueError(f"Dataset {dataset_id} not found")
+            raise NotFoundError(f"Dataset {dataset_id} not found")
+        
+        # Concurrent identical misses may each build the page; they produce
+        # equal entries and the reload underneath is shared
+        cache_key = (dataset_id, page, limit)
+        cached = self._dataset_info_cache.get(cache_key)
+        if cached is not None:
+            self._dataset_info_cache.move_to_end(cache_key)
+            return cached
         
         dataset = self.uploaded_datasets[dataset_id]
-        parsed_data = dataset['parsed_data']
+        parsed_data = await self._get_parsed_data(dataset_id)
         sessions = parsed_data['sessions']
         
         # Calculate pagination
@@ -223,7 +439,7 @@ class AnnotationService:
             }
             preview_sessions.append(preview_session)
         
-        return {
+        info = {
             'dataset_id': dataset_id,
             'filename': dataset['filename'],
             'total_sessions': total_sessions,
@@ -234,25 +450,85 @@ class AnnotationService:
             'total_pages': (total_sessions + limit - 1) // limit,
             'sessions': preview_sessions
         }
+        
+        self._dataset_info_cache[cache_key] = info
+        if len(self._dataset_info_cache) > DATASET_INFO_CACHE_SIZE:
+            self._dataset_info_cache.popitem(last=False)
+        return info
+
+    async def iter_session_summaries(self, dataset_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Return an iterator of SessionSummary-shaped dicts for an uploaded
+        dataset. Raises NotFoundError up front for an unknown dataset.
+        """
+        if dataset_id not in self.uploaded_datasets:
+            raise NotFoundError(f"Dataset {dataset_id} not found")
+        
+        sessions = (await self._get_parsed_data(dataset_id))['sessions']
+        return (
+            {
+                'session_id': session['session_id'],
+                'dataset': dataset_id,
+                'num_events': session.get('num_events', len(session.get('events', []))),
+                'start_time': session.get('start_time', ''),
+                'has_annotations': False
+            }
+            for session in sessions
+        )
 
     async def annotate_session(self, request: AnnotationRequest) -> Dict[str, Any]:
-        """Annotate a single session"""
-        # Create temporary config and orchestrator
-        config = LLMConfig()
-        orchestrator = AnnotationOrchestrator(config)
+        """
+        Annotate a single session
+
+        Returns plain dicts in the shape of AnnotationResponse; the pipeline
+        output is ours, so no models are built just to be encoded once.
+        """
+        # One default-config orchestrator serves every single-session call, so
+        # its agents and the similarity model are set up only once
+        if self._single_session_orchestrator is None:
+            self._single_session_orchestrator = AnnotationOrchestrator(LLMConfig())
+        orchestrator = self._single_session_orchestrator
         
         session = {
             'session_id': request.session_id,
-            'events': [event.dict() for event in request.events]
+            'events': EVENTS_ADAPTER.dump_python(request.events)
         }
         
-        result = await orchestrator._annotate_session(session, "single_session")
+        logs_dir = self.output_dir / "single_session" / "logs"
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        result = await orchestrator._annotate_session(session, "single_session", logs_dir)
+        processing_time = time.perf_counter() - started
+        logger.info(
+            "Annotated session %s: %d events in %.3fs (analyst model %s)",
+            request.session_id, len(session['events']), processing_time,
+            orchestrator.config.analyst_model
+        )
+        
+        annotated_events = [
+            {
+                'event_id': event['event_id'],
+                'cognitive_label': event['cognitive_label'],
+                'agent_decisions': [
+                    {'agent_name': 'analyst', 'label': event['analyst_label'],
+                     'justification': event['analyst_justification']},
+                    {'agent_name': 'critic', 'label': event['critic_label'],
+                     'justification': event['critic_justification']},
+                    {'agent_name': 'judge', 'label': event['cognitive_label'],
+                     'justification': event['judge_justification'],
+                     'confidence': event['confidence_score']},
+                ],
+                'final_justification': event['judge_justification'],
+                'confidence_score': event['confidence_score']
+            }
+            for event in result['annotated_events']
+        ]
         
         return {
-            "session_id": request.session_id,
-            "annotated_events": result['annotated_events'],
-            "processing_time": 0.0,
-            "flagged_for_review": result['flagged_for_review']
+            'session_id': request.session_id,
+            'annotated_events': annotated_events,
+            'processing_time': processing_time,
+            'flagged_for_review': result['flagged_for_review']
         }
     
     async def batch_annotate(self, request: BatchAnnotationRequest) -> str:
@@ -260,32 +536,60 @@ class AnnotationService:
         # TODO: Implement batch annotation
         return "job_123"
     
-    async def get_job_status(self, job_id: str) -> Dict[str, Any]:
-        """Get batch job status (from active jobs or checkpoint)"""
+    async def get_job_status(self, job_id: str, etag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get batch job status (from active jobs or checkpoint)
+
+        The last status of a running job is kept with its ETag for
+        STATUS_CACHE_TTL seconds and returned again while the ETag is
+        unchanged, so repeated polls skip re-reading the checkpoint. Pass the
+        ETag if the caller has already computed it.
+        """
+        if etag is None:
+            etag = self.get_job_status_etag(job_id)
+        now = time.monotonic()
+        # Popped and put back rather than looked up: the job thread drops
+        # entries when jobs end, and each single pop or store is atomic
+        cached = self._status_cache.pop(job_id, None)
+        if cached is not None:
+            expires, cached_etag, cached_status = cached
+            if etag is not None and cached_etag == etag and now < expires:
+                self._status_cache[job_id] = cached
+                return cached_status
+        
+        status = await self._build_job_status(job_id)
+        # The job thread may have moved on while the status was built; only
+        # memoise it if the fingerprint still matches, i.e. both describe the
+        # same snapshot. Finished jobs are not kept at all.
+        if (
+            etag is not None
+            and status['status'] not in _FINAL_STATUSES
+            and self.get_job_status_etag(job_id) == etag
+        ):
+            self._status_cache[job_id] = (now + STATUS_CACHE_TTL, etag, status)
+            if len(self._status_cache) > STATUS_CACHE_SIZE:
+                self._status_cache.popitem(last=False)
+        return status
+    
+    async def _build_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Read a job's status from its orchestrator or its checkpoint"""
         
         # Check active jobs first
-        if job_id in self.active_jobs:
-            orchestrator = self.active_jobs[job_id]
+        job = self.active_jobs.get(job_id)
+        if job is not None:
+            orchestrator = job.orchestrator
             progress = orchestrator.get_progress()
             
             # Get completed session IDs from checkpoint if available
             checkpoint_path = self.checkpoint_dir / f"{job_id}_checkpoint.json"
             completed_session_ids = []
-            if checkpoint_path.exists():
-                try:
-                    with open(checkpoint_path, 'r') as f:
-                        checkpoint = json.load(f)
-                        completed_session_ids = checkpoint.get('completed_sessions', [])
-                except Exception:
-                    pass
-            
             # Check if checkpoint has saved config
             has_saved_config = False
             if checkpoint_path.exists():
                 try:
-                    with open(checkpoint_path, 'r') as f:
-                        checkpoint_data = json.load(f)
-                        has_saved_config = 'config' in checkpoint_data and checkpoint_data['config']
+                    checkpoint = load_checkpoint(checkpoint_path)
+                    completed_session_ids = checkpoint.get('completed_sessions', [])
+                    has_saved_config = 'config' in checkpoint and checkpoint['config']
                 except Exception:
                     pass
             
@@ -301,10 +605,10 @@ class AnnotationService:
                 ),
                 "errors": progress['errors'],
                 "stop_requested": progress.get('stop_requested', False),
-                "session_ids": getattr(orchestrator, 'session_ids', []),
+                "session_ids": job.session_ids,
                 "completed_session_ids": completed_session_ids,  # List of completed session IDs
                 "flagged_sessions": progress.get('flagged_sessions', []),
-                "session_event_counts": getattr(orchestrator, 'session_event_counts', {}),
+                "session_event_counts": orchestrator.get_session_event_counts(),
                 "has_saved_config": has_saved_config,  # Whether checkpoint has LLM config
                 # Diagnostics for disagreement model
                 "disagreement_model": {
@@ -319,8 +623,7 @@ class AnnotationService:
         checkpoint_path = self.checkpoint_dir / f"{job_id}_checkpoint.json"
         if checkpoint_path.exists():
             try:
-                with open(checkpoint_path, 'r') as f:
-                    checkpoint = json.load(f)
+                checkpoint = load_checkpoint(checkpoint_path)
                 
                 progress = checkpoint.get('progress', {})
                 completed_sessions = checkpoint.get('completed_sessions', [])
@@ -392,14 +695,92 @@ class AnnotationService:
             except Exception as e:
                 print(f"[ERROR] Failed to load checkpoint for job {job_id}: {e}")
         
-        raise ValueError(f"Job {job_id} not found")
+        raise NotFoundError(f"Job {job_id} not found")
+    
+    async def watch_job_status(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the job status now and again after every progress change.
+        Ends once the job is completed, stopped or failed, or right away if it
+        is not running.
+        """
+        job = self.active_jobs.get(job_id)
+        if job is None:
+            yield await self.get_job_status(job_id)
+            return
+        orchestrator = job.orchestrator
+        
+        # Register before the first read so no change can slip in between
+        changed = orchestrator.add_progress_listener()
+        try:
+            while True:
+                # Checked before the read, so the last status yielded is final
+                finished = job.future.done()
+                status = await self.get_job_status(job_id)
+                yield status
+                if finished or status['status'] in _FINAL_STATUSES:
+                    return
+                await changed.wait()
+                changed.clear()
+        finally:
+            orchestrator.remove_progress_listener(changed)
+    
+    def get_job_status_etag(self, job_id: str) -> Optional[str]:
+        """
+        Cheap fingerprint of everything get_job_status reports.
+        
+        Built from in-memory progress counters and file stats only, so pollers
+        can be answered with 304 without reading checkpoints or summaries.
+        Returns None when the job is unknown.
+        """
+        checkpoint_path = self.checkpoint_dir / f"{job_id}_checkpoint.json"
+        
+        job = self.active_jobs.get(job_id)
+        if job is not None:
+            orchestrator = job.orchestrator
+            progress = orchestrator.get_progress()
+            return _make_etag(
+                job_id,
+                progress['status'],
+                progress['total_sessions'],
+                progress['completed_sessions'],
+                progress['current_session'],
+                len(progress['errors']),
+                len(progress.get('flagged_sessions', [])),
+                progress.get('stop_requested', False),
+                len(job.session_ids),
+                len(orchestrator.session_event_counts),
+                getattr(orchestrator, 'similarity_model_loaded', False),
+                getattr(orchestrator, 'similarity_model_error', None),
+                _stat_key(checkpoint_path),
+                _stat_key(checkpoint_wal_path(checkpoint_path))
+            )
+        
+        checkpoint_key = _stat_key(checkpoint_path)
+        if checkpoint_key is None:
+            return None
+        # The job directory's mtime changes when the summary file is created
+        return _make_etag(
+            job_id,
+            checkpoint_key,
+            _stat_key(checkpoint_wal_path(checkpoint_path)),
+            _stat_key(self.output_dir / job_id),
+            len(self.uploaded_datasets)
+        )
+    
+    def get_session_log_etag(self, job_id: str, session_id: str) -> Optional[str]:
+        """Fingerprint of a session log, taken from its file which every write updates"""
+        log_key = _stat_key(self.output_dir / job_id / "logs" / f"{session_id}_log.json")
+        if log_key is None:
+            return None
+        return _make_etag(job_id, session_id, log_key)
     
     async def get_session_log(self, job_id: str, session_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed log for a specific session (from active job or saved logs)"""
         
         # Check active jobs first
-        if job_id in self.active_jobs:
-            orchestrator = self.active_jobs[job_id]
+        job = self.active_jobs.get(job_id)
+        if job is not None:
+            orchestrator = job.orchestrator
             return orchestrator.get_session_log(session_id, job_id)
         
         # Check saved log files for completed jobs
@@ -408,20 +789,19 @@ class AnnotationService:
         
         if log_file.exists():
             try:
-                with open(log_file, 'r') as f:
-                    return json.load(f)
+                return orjson.loads(log_file.read_bytes())
             except Exception as e:
                 print(f"[ERROR] Failed to load log for session {session_id}: {e}")
         
-        raise ValueError(f"Log for session {session_id} in job {job_id} not found")
+        raise NotFoundError(f"Log for session {session_id} in job {job_id} not found")
     
     async def stop_job(self, job_id: str) -> Dict[str, Any]:
         """Request a job to stop gracefully"""
-        if job_id not in self.active_jobs:
-            raise ValueError(f"Job {job_id} not found")
+        job = self.active_jobs.get(job_id)
+        if job is None:
+            raise NotFoundError(f"Job {job_id} not found")
         
-        orchestrator = self.active_jobs[job_id]
-        orchestrator.request_stop()
+        job.orchestrator.request_stop()
         
         return {
             "job_id": job_id,
@@ -438,20 +818,20 @@ class AnnotationService:
         """Resume a paused or stopped job from checkpoint"""
         
         # Check if job is already running
-        if job_id in self.active_jobs:
-            orchestrator = self.active_jobs[job_id]
+        job = self.active_jobs.get(job_id)
+        if job is not None:
+            orchestrator = job.orchestrator
             progress = orchestrator.get_progress()
-            if progress['status'] not in ['stopped', 'idle']:
-                raise ValueError(f"Job {job_id} is already running")
+            if progress['status'] not in ['stopped', 'idle', 'failed']:
+                raise ConflictError(f"Job {job_id} is already running")
         
         # Check for checkpoint
         checkpoint_path = self.checkpoint_dir / f"{job_id}_checkpoint.json"
         if not checkpoint_path.exists():
-            raise ValueError(f"No checkpoint found for job {job_id}")
+            raise NotFoundError(f"No checkpoint found for job {job_id}")
         
         # Load checkpoint to get job details
-        with open(checkpoint_path, 'r') as f:
-            checkpoint = json.load(f)
+        checkpoint = load_checkpoint(checkpoint_path)
         
         # Find the dataset and config for this job
         # Look for summary file to get dataset info
@@ -459,7 +839,7 @@ class AnnotationService:
         summary_files = list(job_dir.glob('*_summary.json')) if job_dir.exists() else []
         
         if not summary_files:
-            raise ValueError(f"Cannot resume job {job_id}: missing job metadata")
+            raise NotFoundError(f"Cannot resume job {job_id}: missing job metadata")
         
         with open(summary_files[0], 'r') as f:
             summary = json.load(f)
@@ -472,8 +852,7 @@ class AnnotationService:
             for did, dataset in self.uploaded_datasets.items():
                 if 'job_sessions' in dataset:
                     # Check if this might be the right dataset by comparing session IDs
-                    sessions = dataset['parsed_data']['sessions']
-                    session_ids = [s['session_id'] for s in sessions]
+                    session_ids = dataset['job_sessions']
                     completed_sessions = set(checkpoint.get('completed_sessions', []))
                     
                     # If some of the completed sessions match, this is likely our dataset
@@ -482,13 +861,13 @@ class AnnotationService:
                         break
         
         if not dataset_id:
-            raise ValueError(
+            raise NotFoundError(
                 f"Cannot resume job {job_id}: original dataset not found. "
                 "Please re-upload the dataset and provide dataset_id when resuming."
             )
         
         if dataset_id not in self.uploaded_datasets:
-            raise ValueError(f"Dataset {dataset_id} not found. Please upload the dataset first.")
+            raise NotFoundError(f"Dataset {dataset_id} not found. Please upload the dataset first.")
         
         # Get or create LLM config
         from app.services.llm_agents import SessionHandlingStrategy
@@ -515,6 +894,7 @@ class AnnotationService:
                 session_strategy=SessionHandlingStrategy(llm_config_dict.get('session_strategy', 'truncate')),
                 temperature=llm_config_dict.get('temperature', 0.7),
                 window_size=llm_config_dict.get('window_size', 30),
+                max_concurrent_sessions=llm_config_dict.get('max_concurrent_sessions'),
             )
             print(f"[RESUME] Using provided LLM config")
             if llm_config_dict.get('custom_endpoints'):
@@ -538,6 +918,7 @@ class AnnotationService:
                 session_strategy=SessionHandlingStrategy(saved_config.get('session_strategy', 'truncate')),
                 temperature=saved_config.get('temperature', 0.7),
                 window_size=saved_config.get('window_size', 30),
+                max_concurrent_sessions=saved_config.get('max_concurrent_sessions'),
             )
             print(f"[RESUME] Restored LLM config from checkpoint: {saved_config.get('analyst_model')}, {saved_config.get('critic_model')}, {saved_config.get('judge_model')}")
             if saved_config.get('custom_endpoints'):
@@ -554,25 +935,16 @@ class AnnotationService:
         
         # Create new orchestrator
         orchestrator = AnnotationOrchestrator(config)
-        self.active_jobs[job_id] = orchestrator
         
         # Reset stop flag using the proper method
         orchestrator.reset_stop_flag()
         
         # Get sessions from dataset
-        dataset = self.uploaded_datasets[dataset_id]
-        sessions = dataset['parsed_data']['sessions']
-        session_ids = [s['session_id'] for s in sessions]
-        
-        # Store session list
-        orchestrator.session_ids = session_ids
+        sessions = (await self._get_parsed_data(dataset_id))['sessions']
+        session_ids = tuple(map(_SESSION_ID, sessions))
         
-        # Start annotation in background thread
-        def _run_annotation():
-            asyncio.run(orchestrator.annotate_dataset(sessions, job_id, dataset_name))
-        
-        thread = threading.Thread(target=_run_annotation, daemon=True)
-        thread.start()
+        # Start annotation on the job loop
+        self._start_job(job_id, orchestrator, session_ids, sessions, dataset_name)
         
         return {
             'job_id': job_id,
@@ -581,4 +953,324 @@ class AnnotationService:
             'total_sessions': len(sessions),
             'completed_sessions': len(checkpoint.get('completed_sessions', [])),
             'session_ids': session_ids
-        }
\ No newline at end of file
+        }
+    
+    async def resolve_session(
+        self,
+        job_id: str,
+        session_id: str,
+        label: str,
+        note: str = '',
+        dataset_name: str = 'dataset'
+    ) -> Dict[str, Any]:
+        """Apply a user-selected label to the flagged events of a session"""
+        result = await self.resolve_sessions(
+            job_id,
+            [{'session_id': session_id, 'label': label, 'note': note}],
+            dataset_name
+        )
+        return {
+            "status": result['status'],
+            "session_id": session_id,
+            "label": label,
+            "updated_events": result['updated_events']
+        }
+    
+    async def resolve_sessions(
+        self,
+        job_id: str,
+        resolutions: List[Dict[str, Any]],
+        dataset_name: str = 'dataset'
+    ) -> Dict[str, Any]:
+        """
+        Apply user-selected labels to several sessions of a job at once.
+        
+        Each resolution has a session_id, label, optional note and optional
+        event_ids (defaults to the session's flagged events). All logs are
+        loaded before anything is written, so an unknown session fails the
+        whole batch. The traces CSV is rewritten exactly once, and not at all
+        if no event was changed (status "noop").
+        
+        Resolves of one job run one at a time, active or finished: each
+        rewrites the whole CSV from the current file, so two at once would
+        drop the overrides of whichever replaced the file first.
+        """
+        entry = self._resolve_locks.get(job_id)
+        if entry is None:
+            entry = self._resolve_locks[job_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._apply_resolutions(job_id, resolutions, dataset_name)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._resolve_locks[job_id]
+    
+    async def _apply_resolutions(
+        self,
+        job_id: str,
+        resolutions: List[Dict[str, Any]],
+        dataset_name: str
+    ) -> Dict[str, Any]:
+        """Body of resolve_sessions; callers hold the job's resolve lock"""
+        session_ids = [r['session_id'] for r in resolutions]
+        # One resolution timestamp for every event touched by this call
+        resolved_at = datetime.now().isoformat()
+        logs = await asyncio.gather(
+            *(self._load_session_log(job_id, sid) for sid in session_ids)
+        )
+        
+        results = []
+        for resolution, log in zip(resolutions, logs):
+            updated_count = self._apply_override(
+                log,
+                resolution['label'],
+                resolution.get('note', ''),
+                resolution.get('event_ids'),
+                resolved_at
+            )
+            results.append({
+                'session_id': resolution['session_id'],
+                'label': resolution['label'],
+                'updated_events': updated_count
+            })
+        
+        total_updated = sum(r['updated_events'] for r in results)
+        if total_updated == 0:
+            # Nothing was flagged (e.g. a stale UI call); leave logs and CSV untouched
+            return {
+                "status": "noop",
+                "job_id": job_id,
+                "sessions": results,
+                "updated_events": 0
+            }
+        
+        # Only sessions that actually changed are written back
+        changed_logs = {
+            sid: log for sid, log, r in zip(session_ids, logs, results)
+            if r['updated_events'] > 0
+        }
+        
+        # Persist back to log files
+        await asyncio.gather(
+            *(self._write_session_log(job_id, sid, log) for sid, log in changed_logs.items())
+        )
+        
+        # Patch the CSV off the event loop so other requests keep being served
+        job = self.active_jobs.get(job_id)
+        output_file = self.output_dir / job_id / f"{dataset_name}_cognitive_traces.csv"
+        if output_file.exists():
+            await asyncio.get_running_loop().run_in_executor(
+                self._io_pool,
+                self._rewrite_job_csv,
+                job.orchestrator if job is not None else None,
+                output_file,
+                changed_logs
+            )
+        
+        # Update session logs in active orchestrator if available
+        if job is not None:
+            for session_id, log in changed_logs.items():
+                job.orchestrator._cache_log(session_id, log)
+        
+        return {
+            "status": "ok",
+            "job_id": job_id,
+            "sessions": results,
+            "updated_events": total_updated
+        }
+    
+    async def _load_session_log(self, job_id: str, session_id: str) -> Dict[str, Any]:
+        """Load a session log from the active job or from its saved log file"""
+        
+        # Try to get log from active job first
+        log = None
+        job = self.active_jobs.get(job_id)
+        if job is not None:
+            orchestrator = job.orchestrator
+            log = orchestrator.get_session_log(session_id, job_id)
+        
+        # If not in active jobs, load from saved log file
+        if not log:
+            log_file = self.output_dir / job_id / "logs" / f"{session_id}_log.json"
+            if not log_file.exists():
+                raise NotFoundError(f"Log not found for session {session_id} in job {job_id}")
+            
+            async with aiofiles.open(log_file, 'rb', executor=self._io_pool) as f:
+                log = orjson.loads(await f.read())
+        
+        return log
+    
+    async def _write_session_log(self, job_id: str, session_id: str, log: Dict[str, Any]):
+        """Persist a session log to the job's logs directory"""
+        log_file = self.output_dir / job_id / "logs" / f"{session_id}_log.json"
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(log_file, 'wb', executor=self._io_pool) as f:
+            await f.write(orjson.dumps(log, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+    
+    def _apply_override(
+        self,
+        log: Dict[str, Any],
+        label: str,
+        note: str = '',
+        event_ids: Optional[List[str]] = None,
+        timestamp: Optional[str] = None
+    ) -> int:
+        """
+        Overwrite the cognitive label of events in a session log in place.
+        
+        Targets the given event_ids, or every flagged event when none are given.
+        All updated events get the same override timestamp (default: now).
+        Returns the number of events updated.
+        """
+        if timestamp is None:
+            timestamp = datetime.now().isoformat()
+        targets = {str(eid) for eid in event_ids} if event_ids is not None else None
+        
+        updated_count = 0
+        updated_event_ids = set()
+        for ev in log.get('events', []):
+            if targets is None:
+                selected = ev.get('flagged_for_review', False)
+            else:
+                selected = str(ev.get('event_id')) in targets
+            if selected:
+                ev['cognitive_label'] = label
+                ev['user_override'] = True
+                ev['user_note'] = note
+                # Increment version (default from 1)
+                try:
+                    ev['override_version'] = int(ev.get('override_version', 1)) + 1
+                except Exception:
+                    ev['override_version'] = 2
+                ev['override_timestamp'] = timestamp
+                updated_event_ids.add(ev.get('event_id'))
+                updated_count += 1
+        
+        logger.debug("RESOLVE: Session %s - Updated %s events in log. Flagged IDs: %s",
+                     log.get('session_id'), updated_count, updated_event_ids)
+        return updated_count
+    
+    def _rewrite_job_csv(
+        self,
+        orchestrator: Optional[AnnotationOrchestrator],
+        output_file: Path,
+        session_logs: Dict[str, Dict[str, Any]]
+    ):
+        """Rewrite the traces CSV, pausing the running job's appends if there is one"""
+        if orchestrator is None:
+            self._rewrite_trace_csv(output_file, session_logs)
+            return
+        with orchestrator.exclusive_csv():
+            self._rewrite_trace_csv(output_file, session_logs)
+    
+    def _rewrite_trace_csv(
+        self,
+        output_file: Path,
+        session_logs: Dict[str, Dict[str, Any]]
+    ):
+        """
+        Rewrite the traces CSV with the overridden rows of the given sessions.
+        
+        Rows are streamed from the current file into a temp file in the same
+        directory, which is then swapped in atomically so readers never observe
+        a half-written file. Memory use stays constant regardless of file size.
+        """
+        updated_csv_count = 0
+        # Fallback for events that somehow lack an override timestamp
+        now_iso = datetime.now().isoformat()
+        
+        # Index overridden events once so each CSV row is an O(1) lookup
+        override_maps = {
+            session_id: {
+                str(ev.get('event_id')): ev
+                for ev in log.get('events', [])
+                if ev.get('user_override', False)
+            }
+            for session_id, log in session_logs.items()
+        }
+        event_ids_in_csv = {session_id: set() for session_id in session_logs}
+        
+        fd, tmp_path = tempfile.mkstemp(dir=output_file.parent, suffix='.csv.tmp')
+        try:
+            with open(output_file, 'r', encoding='utf-8', newline='') as src, \
+                    os.fdopen(fd, 'w', encoding='utf-8', newline='') as dst:
+                reader = csv.reader(src)
+                fieldnames = next(reader, None)
+                if not fieldnames:
+                    logger.warning("CSV UPDATE: No rows or fieldnames found for %s", output_file)
+                    os.unlink(tmp_path)
+                    return
+                
+                # Resolve column positions once; rows are then patched by index
+                # instead of being materialized as dicts
+                col = {name: i for i, name in enumerate(fieldnames)}
+                session_idx = col.get('session_id')
+                event_idx = col.get('event_id')
+                if session_idx is None or event_idx is None:
+                    logger.warning("CSV UPDATE: session_id/event_id columns missing in %s", output_file)
+                    os.unlink(tmp_path)
+                    return
+                patch_cols = [
+                    (col[name], name) for name in
+                    ('cognitive_label', 'user_override', 'override_version', 'override_timestamp')
+                    if name in col
+                ]
+                
+                writer = csv.writer(dst, quoting=csv.QUOTE_ALL)
+                writer.writerow(fieldnames)
+                for row in reader:
+                    if not row:
+                        continue
+                    session_id = row[session_idx]
+                    override_map = override_maps.get(session_id)
+                    if override_map is not None:
+                        event_id = row[event_idx]
+                        event_ids_in_csv[session_id].add(event_id)
+                        ev = override_map.get(event_id)
+                        if ev is not None:
+                            logger.debug("CSV UPDATE: Updating event %s with label %s", event_id, ev['cognitive_label'])
+                            values = {
+                                'cognitive_label': ev['cognitive_label'],
+                                'user_override': 'True',
+                                'override_version': str(ev.get('override_version', 2)),
+                                'override_timestamp': ev.get('override_timestamp', now_iso),
+                            }
+                            for idx, name in patch_cols:
+                                row[idx] = values[name]
+                            updated_csv_count += 1
+                    writer.writerow(row)
+                
+                # Append events that are in the log but missing from the CSV,
+                # projecting log fields onto this file's column order once
+                row_template = [_MISSING_ROW_FIELDS.get(name, ('', '')) for name in fieldnames]
+                session_idx_in_template = col.get('session_id')
+                bool_idx_in_template = [col[name] for name in _MISSING_ROW_BOOL_COLUMNS if name in col]
+                for session_id, log in session_logs.items():
+                    log_event_ids = {str(ev['event_id']) for ev in log.get('events', [])}
+                    missing_event_ids = log_event_ids - event_ids_in_csv[session_id]
+                    if not missing_event_ids:
+                        continue
+                    
+                    logger.warning("CSV UPDATE: %s events in log but not in CSV: %s", len(missing_event_ids), missing_event_ids)
+                    for ev in log.get('events', []):
+                        if str(ev['event_id']) in missing_event_ids:
+                            row = [ev.get(key, default) for key, default in row_template]
+                            if session_idx_in_template is not None:
+                                row[session_idx_in_template] = session_id
+                            for idx in bool_idx_in_template:
+                                row[idx] = _BOOL_STR[bool(row[idx])]
+                            writer.writerow(row)
+                            if ev.get('user_override', False):
+                                updated_csv_count += 1
+                                logger.debug("CSV UPDATE: Added missing event %s with user override", ev['event_id'])
+            
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        logger.debug("CSV UPDATE: Updated %s events for %s session(s) in %s",
+                     updated_csv_count, len(session_logs), output_file)
@@ -4,41 +4,47 @@ File parsing service for extracting sessions from uploaded datasets
 
 import csv
 import json
-import io
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Iterable
 from collections import defaultdict
 import pandas as pd
 
+from app.core.errors import InvalidInputError
+
 
 class FileParser:
     """Parse uploaded CSV/JSON files and extract sessions"""
     
     @staticmethod
-    async def parse_file(file_content: bytes, filename: str) -> Dict[str, Any]:
+    def parse_file(file_path: Path, filename: str) -> Dict[str, Any]:
         """
         Parse uploaded file and extract sessions
         
+        Parsing is blocking, so async callers should run it in an executor.
+        
         Args:
-            file_content: Raw file bytes
+            file_path: Uploaded file, spooled to disk
             filename: Name of uploaded file
             
         Returns:
             Dict with sessions and metadata
         """
         if filename.endswith('.csv'):
-            return await FileParser._parse_csv(file_content)
+            return FileParser._parse_csv(file_path)
+        elif filename.endswith('.jsonl'):
+            return FileParser._parse_jsonl(file_path)
         elif filename.endswith('.json'):
-            return await FileParser._parse_json(file_content)
+            return FileParser._parse_json(file_path)
         else:
-            raise ValueError(f"Unsupported file format: {filename}")
+            raise InvalidInputError(f"Unsupported file format: {filename}")
     
     @staticmethod
-    async def _parse_csv(file_content: bytes) -> Dict[str, Any]:
+    def _parse_csv(file_path: Path) -> Dict[str, Any]:
         """Parse CSV file and extract sessions"""
         try:
             # Read CSV into pandas DataFrame with proper quoting for JSON content
             df = pd.read_csv(
-                io.BytesIO(file_content),
+                file_path,
                 quoting=csv.QUOTE_ALL,
                 encoding='utf-8',
                 keep_default_na=False
@@ -51,7 +57,7 @@ class FileParser:
             missing_cols = [col for col in required_cols if col not in df.columns]
             
             if missing_cols:
-                raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+                raise InvalidInputError(f"Missing required columns: {', '.join(missing_cols)}")
             
             # Group events by session_id
             sessions_dict = defaultdict(list)
@@ -76,7 +82,7 @@ class FileParser:
                     sessions_dict[str(row['session_id'])].append(event)
                 except Exception as row_error:
                     print(f"[FileParser] Error processing row {idx}: {row_error}")
-                    raise ValueError(f"Error processing row {idx}: {row_error}")
+                    raise InvalidInputError(f"Error processing row {idx}: {row_error}")
             
             # Convert to list of sessions
             sessions = []
@@ -111,44 +117,63 @@ class FileParser:
             print(f"[FileParser] Error parsing CSV file: {str(e)}")
             import traceback
             traceback.print_exc()
-            raise ValueError(f"Error parsing CSV file: {str(e)}")
+            raise InvalidInputError(f"Error parsing CSV file: {str(e)}")
     
     @staticmethod
-    async def _parse_json(file_content: bytes) -> Dict[str, Any]:
+    def _group_events(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Group a flat stream of events into sessions by session_id"""
+        sessions_dict = defaultdict(list)
+        
+        for event in events:
+            if 'session_id' not in event:
+                raise InvalidInputError("Each event must have a 'session_id' field")
+            
+            sessions_dict[str(event['session_id'])].append(event)
+        
+        sessions = []
+        total_events = 0
+        
+        for session_id, events in sessions_dict.items():
+            events.sort(key=lambda e: e.get('timestamp', ''))
+            sessions.append({
+                'session_id': session_id,
+                'num_events': len(events),
+                'start_time': events[0].get('timestamp', ''),
+                'end_time': events[-1].get('timestamp', ''),
+                'events': events
+            })
+            total_events += len(events)
+        
+        return {
+            'total_sessions': len(sessions),
+            'total_events': total_events,
+            'sessions': sessions
+        }
+    
+    @staticmethod
+    def _parse_jsonl(file_path: Path) -> Dict[str, Any]:
+        """Parse JSON Lines file of events, one line at a time"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return FileParser._group_events(
+                    json.loads(line) for line in f if line.strip()
+                )
+        except json.JSONDecodeError as e:
+            raise InvalidInputError(f"Invalid JSON Lines format: {str(e)}")
+        except Exception as e:
+            raise InvalidInputError(f"Error parsing JSON Lines file: {str(e)}")
+    
+    @staticmethod
+    def _parse_json(file_path: Path) -> Dict[str, Any]:
         """Parse JSON file and extract sessions"""
         try:
-            data = json.loads(file_content.decode('utf-8'))
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
             
             # Handle different JSON structures
             if isinstance(data, list):
                 # List of events - group by session_id
-                sessions_dict = defaultdict(list)
-                
-                for event in data:
-                    if 'session_id' not in event:
-                        raise ValueError("Each event must have a 'session_id' field")
-                    
-                    sessions_dict[str(event['session_id'])].append(event)
-                
-                sessions = []
-                total_events = 0
-                
-                for session_id, events in sessions_dict.items():
-                    events.sort(key=lambda e: e.get('timestamp', ''))
-                    sessions.append({
-                        'session_id': session_id,
-                        'num_events': len(events),
-                        'start_time': events[0].get('timestamp', ''),
-                        'end_time': events[-1].get('timestamp', ''),
-                        'events': events
-                    })
-                    total_events += len(events)
-                
-                return {
-                    'total_sessions': len(sessions),
-                    'total_events': total_events,
-                    'sessions': sessions
-                }
+                return FileParser._group_events(data)
                 
             elif isinstance(data, dict) and 'sessions' in data:
                 # Already structured as sessions
@@ -161,10 +186,10 @@ class FileParser:
                     'sessions': sessions
                 }
             else:
-                raise ValueError("JSON must be a list of events or dict with 'sessions' key")
+                raise InvalidInputError("JSON must be a list of events or dict with 'sessions' key")
                 
         except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {str(e)}")
+            raise InvalidInputError(f"Invalid JSON format: {str(e)}")
         except Exception as e:
-            raise ValueError(f"Error parsing JSON file: {str(e)}")
+            raise InvalidInputError(f"Error parsing JSON file: {str(e)}")
 
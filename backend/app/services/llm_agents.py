@@ -6,12 +6,16 @@ import anthropic
 import openai
 from typing import List, Dict, Any, Optional
 from enum import Enum
-import json
 import time
 import asyncio
 import httpx
 import google.generativeai as genai
 
+from app.schemas.annotation import BATCHED_AGENT_RESPONSE_ADAPTER
+from app.core.config import settings
+from app.services.prompt_cache import prompt_cache_key, get_cached_reply, cache_reply
+from app.services.rate_limit import acquire_budget, is_rate_limited
+
 
 class ModelProvider(str, Enum):
     """Supported LLM providers"""
@@ -30,7 +34,26 @@ class SessionHandlingStrategy(str, Enum):
 
 
 class LLMConfig:
-    """Configuration for LLM agents"""
+    """
+    Configuration for LLM agents
+
+    Built once per job from the validated LLMConfigSchema dump; slots keep
+    the agents' per-prompt attribute reads cheap.
+    """
+    __slots__ = (
+        'analyst_model', 'critic_model', 'judge_model',
+        'anthropic_api_key', 'openai_api_key', 'google_api_key', 'mistral_api_key', 'ollama_base_url',
+        'custom_endpoints', 'custom_endpoint_map',
+        'enable_fallback', 'fallback_analyst_model', 'fallback_critic_model', 'fallback_judge_model',
+        'fallback_retry_after',
+        'session_strategy', 'window_size', 'max_concurrent_sessions',
+        'temperature', 'max_tokens_base', 'max_tokens_cap', 'tokens_per_event',
+        'truncate_content_small', 'truncate_content_medium', 'truncate_content_large',
+        'truncate_reasoning_small', 'truncate_reasoning_medium', 'truncate_reasoning_large',
+        '_truncation_limits',
+        'analyst_prompt_override', 'critic_prompt_override', 'judge_prompt_override',
+    )
+    
     def __init__(
         self,
         # Model selection
@@ -58,6 +81,7 @@ class LLMConfig:
         # Session handling
         session_strategy: SessionHandlingStrategy = SessionHandlingStrategy.TRUNCATE,
         window_size: int = 30,  # Number of events for sliding window
+        max_concurrent_sessions: Optional[int] = None,  # None: settings.MAX_CONCURRENT_SESSIONS
         
         # Model parameters
         temperature: float = 0.7,
@@ -120,6 +144,7 @@ class LLMConfig:
         # Session handling
         self.session_strategy = session_strategy
         self.window_size = window_size
+        self.max_concurrent_sessions = max_concurrent_sessions
         
         # Model parameters
         self.temperature = temperature
@@ -134,6 +159,12 @@ class LLMConfig:
         self.truncate_reasoning_small = truncate_reasoning_small
         self.truncate_reasoning_medium = truncate_reasoning_medium
         self.truncate_reasoning_large = truncate_reasoning_large
+        # (content, reasoning) limits indexed by session size bucket, see get_truncation_limits
+        self._truncation_limits = (
+            (truncate_content_small, truncate_reasoning_small),
+            (truncate_content_medium, truncate_reasoning_medium),
+            (truncate_content_large, truncate_reasoning_large),
+        )
         
         # Custom prompts
         self.analyst_prompt_override = analyst_prompt_override
@@ -169,14 +200,10 @@ class LLMConfig:
         """
         if self.session_strategy != SessionHandlingStrategy.TRUNCATE:
             # For non-truncate strategies, use small limits (already windowed)
-            return self.truncate_content_small, self.truncate_reasoning_small
+            return self._truncation_limits[0]
         
-        if num_events <= 20:
-            return self.truncate_content_small, self.truncate_reasoning_small
-        elif num_events <= 50:
-            return self.truncate_content_medium, self.truncate_reasoning_medium
-        else:
-            return self.truncate_content_large, self.truncate_reasoning_large
+        # Bucket 0: ≤20 events, 1: 21-50 events, 2: >50 events
+        return self._truncation_limits[(num_events > 20) + (num_events > 50)]
     
     def apply_session_strategy(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -393,21 +420,36 @@ class UniversalLLMClient:
         # Use provided temperature or default from config
         temp = temperature if temperature is not None else self.config.temperature
         
+        # Identical prompts (e.g. re-annotating a session) are answered from the cache
+        # The same model name can be served by several endpoints
+        if model in self.config.custom_endpoint_map:
+            endpoint = self.config.custom_endpoint_map[model]['base_url']
+        elif provider == ModelProvider.OLLAMA:
+            endpoint = self.config.ollama_base_url
+        else:
+            endpoint = provider.value
+        cache_key = prompt_cache_key(endpoint, model, prompt, max_tokens, temp)
+        cached_text = await get_cached_reply(cache_key)
+        if cached_text is not None:
+            return cached_text, time.time() - start_time
+        
+        # Budget the prompt plus the reply, as provider token limits do
+        await acquire_budget(role, self.config._estimate_token_count(prompt) + max_tokens)
+        
+        attempts = max(1, settings.RATE_LIMIT_RETRIES)
         try:
-            if provider == ModelProvider.ANTHROPIC:
-                response_text = await self._generate_anthropic(model, prompt, max_tokens, temp)
-            elif provider == ModelProvider.OPENAI:
-                response_text = await self._generate_openai(model, prompt, max_tokens, temp)
-            elif provider == ModelProvider.GOOGLE:
-                response_text = await self._generate_google(model, prompt, max_tokens, temp)
-            elif provider == ModelProvider.MISTRAL:
-                response_text = await self._generate_mistral(model, prompt, max_tokens, temp)
-            elif provider == ModelProvider.OLLAMA:
-                response_text = await self._generate_ollama(model, prompt, max_tokens, temp)
-            else:
-                raise ValueError(f"Unknown provider for model: {model}")
+            for attempt in range(attempts):
+                try:
+                    response_text = await self._dispatch(provider, model, prompt, max_tokens, temp)
+                    break
+                except Exception as e:
+                    if attempt + 1 == attempts or not is_rate_limited(e):
+                        raise
+                    # Back off 1s, 2s, ... before retrying a 429
+                    await asyncio.sleep(2 ** attempt)
             
             elapsed_time = time.time() - start_time
+            await cache_reply(cache_key, response_text)
             return response_text, elapsed_time
             
         except Exception as e:
@@ -415,6 +457,21 @@ class UniversalLLMClient:
             self._record_failure(original_model)
             raise Exception(f"Error generating with {provider.value}: {str(e)}")
     
+    async def _dispatch(self, provider: ModelProvider, model: str, prompt: str, max_tokens: int, temperature: float) -> str:
+        """Send the prompt to the provider's generate method"""
+        if provider == ModelProvider.ANTHROPIC:
+            return await self._generate_anthropic(model, prompt, max_tokens, temperature)
+        elif provider == ModelProvider.OPENAI:
+            return await self._generate_openai(model, prompt, max_tokens, temperature)
+        elif provider == ModelProvider.GOOGLE:
+            return await self._generate_google(model, prompt, max_tokens, temperature)
+        elif provider == ModelProvider.MISTRAL:
+            return await self._generate_mistral(model, prompt, max_tokens, temperature)
+        elif provider == ModelProvider.OLLAMA:
+            return await self._generate_ollama(model, prompt, max_tokens, temperature)
+        else:
+            raise ValueError(f"Unknown provider for model: {model}")
+    
     async def _generate_anthropic(self, model: str, prompt: str, max_tokens: int, temperature: float) -> str:
         """Generate using Anthropic Claude"""
         client = anthropic.AsyncAnthropic(api_key=self.config.anthropic_api_key)
@@ -578,6 +635,22 @@ LABEL_SCHEMA = """
 """
 
 
+def parse_decision_array(response: str) -> List[Dict[str, Any]]:
+    """
+    Extract the JSON array of per-event decisions from an agent response
+    
+    Each agent labels a whole session in one call, so the reply is a single
+    array with one object per event, possibly wrapped in prose or a code fence.
+    """
+    start_idx = response.find('[')
+    end_idx = response.rfind(']') + 1
+    
+    if start_idx == -1 or end_idx == 0:
+        raise ValueError("No JSON array found in response")
+    
+    return BATCHED_AGENT_RESPONSE_ADAPTER.validate_json(response[start_idx:end_idx])
+
+
 class AnalystAgent:
     """Analyst agent for initial cognitive trace analysis"""
     
@@ -702,17 +775,7 @@ Provide ONLY the JSON array, no additional text. MUST include all {len(session_e
     def _parse_response(self, response: str, session_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Parse LLM response into structured decisions"""
         try:
-            # Extract JSON from response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON array found in response")
-            
-            json_str = response[start_idx:end_idx]
-            decisions = json.loads(json_str)
-            
-            return decisions
+            return parse_decision_array(response)
             
         except Exception as e:
             # Fallback: create default decisions
@@ -854,16 +917,7 @@ Provide ONLY the JSON array, no additional text. MUST include all {len(session_e
     ) -> List[Dict[str, Any]]:
         """Parse critic response"""
         try:
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON array found in response")
-            
-            json_str = response[start_idx:end_idx]
-            decisions = json.loads(json_str)
-            
-            return decisions
+            return parse_decision_array(response)
             
         except Exception as e:
             # Fallback: agree with analyst
@@ -1010,16 +1064,7 @@ Provide ONLY the JSON array, no additional text. MUST include all {len(session_e
     def _parse_response(self, response: str, fallback_decisions: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """Parse judge response"""
         try:
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON array found in response")
-            
-            json_str = response[start_idx:end_idx]
-            decisions = json.loads(json_str)
-            
-            return decisions
+            return parse_decision_array(response)
             
         except Exception as e:
             # If we have fallback decisions (from critic), use them
@@ -2,13 +2,61 @@
 Service for managing LLM model providers and retrieving available models
 """
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 import anthropic
 import openai
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Awaitable, Callable, Tuple
 import httpx
+import orjson
 import os
 
 
+# Provider catalogs change hours-to-days apart; keep upstream listings briefly
+MODEL_CACHE_TTL = 300.0
+MODEL_CACHE_SIZE = 256
+
+_model_cache: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+_model_cache_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+def _model_cache_key(provider: str, credential: str) -> Tuple[str, str]:
+    """Cache key that does not keep the raw API key in memory"""
+    digest = hashlib.blake2b(credential.encode(), digest_size=16).hexdigest()
+    return provider, digest
+
+
+async def _cached_fetch(key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return a fresh cached listing or fetch it once for concurrent callers.
+    A fetch that yields None is passed through without being cached.
+    """
+    entry = _model_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    lock = _model_cache_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            entry = _model_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+
+            value = await fetch()
+            if value is None:
+                return None
+            _model_cache[key] = (time.monotonic() + MODEL_CACHE_TTL, value)
+            _model_cache.move_to_end(key)
+            while len(_model_cache) > MODEL_CACHE_SIZE:
+                _model_cache.popitem(last=False)
+            return value
+    finally:
+        if not lock.locked() and _model_cache_locks.get(key) is lock:
+            del _model_cache_locks[key]
+
+
 class ModelProvider:
     """Manage different LLM providers and their models"""
     
@@ -105,9 +153,12 @@ class ModelProvider:
         try:
             # If API key provided, fetch from API
             if api_key:
-                client = openai.OpenAI(api_key=api_key)
-                models_response = client.models.list()
-                all_models = [m.id for m in models_response.data]
+                async def list_models() -> List[str]:
+                    client = openai.AsyncOpenAI(api_key=api_key)
+                    models_response = await client.models.list()
+                    return [m.id for m in models_response.data]
+
+                all_models = await _cached_fetch(_model_cache_key('openai', api_key), list_models)
                 
                 # Filter to only chat models we care about
                 filtered = [m for m in all_models if any(
@@ -309,31 +360,32 @@ class ModelProvider:
     async def get_ollama_models(base_url: str = "http://localhost:11434") -> List[Dict[str, Any]]:
         """Get available Ollama models from local instance"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{base_url}/api/tags")
+            async def list_tags() -> Optional[Dict[str, Any]]:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.get(f"{base_url}/api/tags")
+                    return orjson.loads(response.content) if response.status_code == 200 else None
+
+            data = await _cached_fetch(_model_cache_key('ollama', base_url), list_tags)
+            if data is None:
+                return []
+
+            models = []
+            for model in data.get('models', []):
+                model_name = model.get('name', '')
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    models = []
-                    
-                    for model in data.get('models', []):
-                        model_name = model.get('name', '')
-                        
-                        models.append({
-                            'id': model_name,
-                            'name': model_name.split(':')[0].title(),
-                            'provider': 'ollama',
-                            'description': f"Local Ollama model - {model.get('size', 'unknown size')}",
-                            'context_window': model.get('context_length', 8192),
-                            'cost': 'free',
-                            'recommended': True,
-                            'size': model.get('size'),
-                            'modified': model.get('modified_at')
-                        })
-                    
-                    return models
-                else:
-                    return []
+                models.append({
+                    'id': model_name,
+                    'name': model_name.split(':')[0].title(),
+                    'provider': 'ollama',
+                    'description': f"Local Ollama model - {model.get('size', 'unknown size')}",
+                    'context_window': model.get('context_length', 8192),
+                    'cost': 'free',
+                    'recommended': True,
+                    'size': model.get('size'),
+                    'modified': model.get('modified_at')
+                })
+            
+            return models
                     
         except httpx.ConnectError:
             print(f"Ollama not reachable at {base_url}. Make sure Ollama is running.")
@@ -351,17 +403,26 @@ class ModelProvider:
         ollama_url: str = "http://localhost:11434",
         include_ollama: bool = True
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Get all available models from all providers"""
+        """Get all available models from all providers, fetched concurrently"""
+        providers = ['anthropic', 'openai', 'google', 'mistral']
+        fetches = [
+            ModelProvider.get_anthropic_models(anthropic_key),
+            ModelProvider.get_openai_models(openai_key),
+            ModelProvider.get_google_models(google_key),
+            ModelProvider.get_mistral_models(mistral_key),
+        ]
+        if include_ollama:
+            providers.append('ollama')
+            fetches.append(ModelProvider.get_ollama_models(ollama_url))
         
-        models = {
-            'anthropic': await ModelProvider.get_anthropic_models(anthropic_key),
-            'openai': await ModelProvider.get_openai_models(openai_key),
-            'google': await ModelProvider.get_google_models(google_key),
-            'mistral': await ModelProvider.get_mistral_models(mistral_key),
-        }
+        results = await asyncio.gather(*fetches, return_exceptions=True)
         
-        if include_ollama:
-            models['ollama'] = await ModelProvider.get_ollama_models(ollama_url)
+        models = {}
+        for provider, result in zip(providers, results):
+            if isinstance(result, BaseException):
+                print(f"Error fetching {provider} models: {result}")
+                result = []
+            models[provider] = result
         
         return models
     
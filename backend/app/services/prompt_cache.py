@@ -0,0 +1,73 @@
+"""
+Exact-match cache of LLM replies in Redis
+
+Re-annotating a session sends the agents byte-identical prompts, so a reply
+is stored under a SHA-256 of the prompt, the endpoint that answered it and
+the generation parameters. The cache is best effort: if Redis is unreachable
+or fails in any way, callers go to the model.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pooled connections belong to the loop that opened them, and batch jobs run
+# on their own loop next to the server's, so each loop gets its own client.
+# from_url does not connect; the pool opens connections on first use.
+_clients: Dict[asyncio.AbstractEventLoop, redis.Redis] = {}
+
+
+def _client() -> redis.Redis:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=1.0,
+            socket_timeout=1.0,
+        )
+    return client
+
+
+def prompt_cache_key(
+    endpoint: str, model: str, prompt: str, max_tokens: int, temperature: float
+) -> str:
+    """Key a reply by endpoint, model, generation parameters and prompt digest"""
+    digest = hashlib.sha256(prompt.encode()).hexdigest()
+    return f"prompt:{endpoint}:{model}:{max_tokens}:{temperature}:{digest}"
+
+
+async def get_cached_reply(key: str) -> Optional[str]:
+    """Return the cached reply, or None on a miss or when the cache fails"""
+    if settings.PROMPT_CACHE_TTL <= 0:
+        return None
+    try:
+        return await _client().get(key)
+    except Exception as e:
+        logger.debug("Prompt cache lookup failed: %s", e)
+        return None
+
+
+async def cache_reply(key: str, reply: str) -> None:
+    """Store a reply for PROMPT_CACHE_TTL seconds"""
+    if settings.PROMPT_CACHE_TTL <= 0:
+        return
+    try:
+        await _client().setex(key, settings.PROMPT_CACHE_TTL, reply)
+    except Exception as e:
+        logger.debug("Prompt cache store failed: %s", e)
+
+
+async def close_prompt_cache() -> None:
+    """Close the calling loop's client; other loops' clients die with their loop"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,92 @@
+"""
+int8-quantized all-MiniLM-L6-v2 on ONNX Runtime for CPU-only hosts
+
+Needs the optional `optimum[onnxruntime]` package. The model is exported
+and dynamically quantized once into ~/.cache/cognitive-traces, then loaded
+from there. load_int8_encoder returns None when optimum is missing or the
+export fails, and callers fall back to SentenceTransformer.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+import torch
+
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+CACHE_DIR = Path.home() / ".cache" / "cognitive-traces" / "minilm-int8"
+QUANTIZED_FILE = "model_quantized.onnx"
+# SentenceTransformer's max_seq_length for this model
+MAX_SEQ_LENGTH = 256
+
+
+class Int8SentenceEncoder:
+    """Mean-pooled sentence embeddings, matching SentenceTransformer.encode's use here"""
+
+    # ONNX Runtime runs on the CPU execution provider, so outputs live there
+    device = torch.device("cpu")
+
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = False,
+        **_: object
+    ):
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="pt"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+            batches.append((token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9))
+        embeddings = torch.cat(batches)
+        if normalize_embeddings:
+            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        return embeddings if convert_to_tensor else embeddings.numpy()
+
+
+def _export_quantized() -> None:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    fp32_dir = CACHE_DIR / "fp32"
+    ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True).save_pretrained(fp32_dir)
+    # Dynamic quantization: int8 weights, activations quantized per batch
+    quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(fp32_dir).quantize(
+        save_dir=CACHE_DIR, quantization_config=quantization_config
+    )
+    AutoTokenizer.from_pretrained(MODEL_ID).save_pretrained(CACHE_DIR)
+
+
+def load_int8_encoder() -> Optional[Int8SentenceEncoder]:
+    """Load the quantized encoder, exporting it on first use; None if unavailable"""
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+
+    try:
+        if not (CACHE_DIR / QUANTIZED_FILE).exists():
+            print(f"[DISAGREEMENT] Exporting int8 ONNX encoder to {CACHE_DIR}...")
+            _export_quantized()
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            CACHE_DIR, file_name=QUANTIZED_FILE, provider="CPUExecutionProvider"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(CACHE_DIR)
+    except Exception as e:
+        print(f"[DISAGREEMENT][WARN] int8 ONNX encoder unavailable, using SentenceTransformer: {e}")
+        return None
+    return Int8SentenceEncoder(model, tokenizer)
@@ -0,0 +1,86 @@
+"""
+In-process request and token budgets for the agent roles
+
+Each role (analyst, critic, judge) gets its own requests-per-minute and
+tokens-per-minute bucket, shared by every session annotated concurrently in
+this worker, so the fan-out waits for budget instead of drawing 429s.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Refills `rate` units per `period` seconds, holding at most `rate`"""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = rate
+        self._refill_per_second = rate / period if rate > 0 else 0.0
+        self._level = float(rate)
+        self._updated = time.monotonic()
+        # The buckets are shared by the server loop and the batch job loop,
+        # so the state is guarded by a thread lock that is never held across
+        # an await. Reservations may drive the level negative; each caller
+        # then sleeps off its own debt, so budget is granted in arrival order.
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: int) -> float:
+        """Take `amount` units now and return how long the caller must wait for them"""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(
+                self.capacity,
+                self._level + (now - self._updated) * self._refill_per_second,
+            )
+            self._updated = now
+            self._level -= amount
+            return max(0.0, -self._level / self._refill_per_second)
+
+    async def acquire(self, amount: int = 1) -> None:
+        """Wait until `amount` units are available and take them; rate 0 is unlimited"""
+        if self.capacity <= 0:
+            return
+        # A request larger than the whole budget waits for a full bucket
+        amount = min(amount, self.capacity)
+        delay = self._reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# role -> (requests bucket, tokens bucket)
+_budgets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {
+    'analyst': (TokenBucket(settings.RPM_ANALYST), TokenBucket(settings.TPM_ANALYST)),
+    'critic': (TokenBucket(settings.RPM_CRITIC), TokenBucket(settings.TPM_CRITIC)),
+    'judge': (TokenBucket(settings.RPM_JUDGE), TokenBucket(settings.TPM_JUDGE)),
+}
+
+
+async def acquire_budget(role: str, estimated_tokens: int) -> None:
+    """Take one request and `estimated_tokens` from the role's budgets"""
+    budget = _budgets.get(role)
+    if budget is None:
+        return
+    requests, tokens = budget
+    await requests.acquire()
+    await tokens.acquire(estimated_tokens)
+
+
+def is_rate_limited(exc: Optional[BaseException]) -> bool:
+    """
+    True if the error, or one it was raised from, is an HTTP 429.
+    Provider SDKs expose `status_code` (Anthropic, OpenAI) or `code` (Google);
+    the Mistral path re-raises httpx errors as ValueError.
+    """
+    while exc is not None:
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+            return True
+        if getattr(exc, 'status_code', None) == 429 or getattr(exc, 'code', None) == 429:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
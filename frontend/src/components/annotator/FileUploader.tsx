@@ -24,6 +24,7 @@ export function FileUploader({ onUpload, isLoading }: FileUploaderProps) {
     accept: {
       'text/csv': ['.csv'],
       'application/json': ['.json'],
+      'application/x-ndjson': ['.jsonl'],
       'application/xml': ['.xml'],
     },
     maxFiles: 1,
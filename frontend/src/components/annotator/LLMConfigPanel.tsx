@@ -45,6 +45,7 @@ interface LLMConfig {
   // Session handling
   session_strategy?: 'truncate' | 'sliding_window' | 'full'
   window_size?: number
+  max_concurrent_sessions?: number
   
   // Model parameters
   temperature?: number
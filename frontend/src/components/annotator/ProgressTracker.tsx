@@ -658,7 +658,7 @@ export function ProgressTracker({ jobId, totalSessions, sessionIds: propSessionI
                 </span>
                 <input
                   type="file"
-                  accept=".csv,.json"
+                  accept=".csv,.json,.jsonl"
                   onChange={(e) => setReuploadFile(e.target.files?.[0] || null)}
                   className="block w-full text-sm text-gray-500
                     file:mr-4 file:py-2 file:px-4
@@ -33,6 +33,7 @@ export function UploadSection({ onUploadComplete }: UploadSectionProps) {
     accept: {
       'text/csv': ['.csv'],
       'application/json': ['.json'],
+      'application/x-ndjson': ['.jsonl'],
       'application/xml': ['.xml'],
     },
     maxFiles: 1,